@@ -2,10 +2,15 @@
 Decision Agent - Makes autonomous recommendations based on risks & simulations
 """
 
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import logging
+import time
+from collections import OrderedDict
+from operator import itemgetter
 from datetime import datetime, timezone
 
+import numpy as np
+
 from core.memory import memory
 
 logger = logging.getLogger(__name__)
@@ -22,6 +27,9 @@ CRITICAL_SERVICE_IMPACT = 60    # >60% service loss is critical
 HIGH_SERVICE_IMPACT = 40        # 40-60% is high
 MEDIUM_SERVICE_IMPACT = 20      # 20-40% is medium
 
+# Max scenario decisions kept between runs (least recently used are evicted)
+DECISION_CACHE_SIZE = 1024
+
 # Material criticality scores (1-5, higher = more critical to supply chain)
 MATERIAL_CRITICALITY = {
     "Semiconductors": 5,        # Mission-critical, long lead times
@@ -44,6 +52,9 @@ COUNTRY_GEOPOLITICAL_RISK = {
     "India": 2,                 # Moderate economic volatility
 }
 
+# Countries where critical materials trigger long-term diversification
+HIGH_GEO_RISK_COUNTRIES = frozenset({"China", "Taiwan"})
+
 # Action templates with urgency (1-5, higher = more urgent)
 ACTION_LIBRARY = {
     "do_nothing": {
@@ -90,52 +101,208 @@ ACTION_LIBRARY = {
     }
 }
 
+# Urgency levels present in the library, most urgent first (actions are emitted bucket by bucket)
+URGENCY_LEVELS = sorted({info["urgency"] for info in ACTION_LIBRARY.values()}, reverse=True)
+
+
+def _confidence_batch(severity: np.ndarray, delay_days: np.ndarray, service_impact: np.ndarray,
+                      material_criticality: np.ndarray, country_risk: np.ndarray) -> List[float]:
+    """
+    Confidence math behind DecisionAgent.calculate_confidence, as one vectorized pass
+    over many scenarios.
+    """
+    # Base confidence from risk severity
+    base_confidence = np.minimum(severity, 1.0)
+
+    # Delay impact factor (0 to 0.2)
+    delay_factor = np.minimum(delay_days / CRITICAL_DELAY_DAYS, 1.0) * 0.2
+
+    # Service impact factor (0 to 0.2)
+    service_factor = np.minimum(service_impact / CRITICAL_SERVICE_IMPACT, 1.0) * 0.2
+
+    # Material criticality factor (0 to 0.2)
+    criticality_factor = (material_criticality / 5.0) * 0.2
+
+    # Country geopolitical risk factor (0 to 0.2)
+    country_factor = (country_risk / 5.0) * 0.2
+
+    # Total confidence (base + factors, capped at 1.0)
+    total_confidence = np.minimum(base_confidence + delay_factor + service_factor + criticality_factor + country_factor, 1.0)
+
+    # Round in Python (not np.round, which rounds some halves differently)
+    return [round(c, 2) for c in total_confidence.tolist()]
+
+
+# ─── Decision table ─────────────────────────────────────────────────────────────
+# Each tier builds its action list from the per-scenario context dict.
+
+def _critical_actions(ctx: Dict[str, Any]) -> List[str]:
+    """CRITICAL RISK: Severe impact, immediate action."""
+    # Expedite if node failure (structural disruption), otherwise
+    # capacity reduction → increase stock and activate alternatives
+    if ctx["disruption_type"] == "node_failure":
+        actions = ["expedite_shipment", "activate_alternative_source"]
+    else:
+        actions = ["increase_safety_stock", "activate_alternative_source"]
+
+    # If material is critical, diversify for long-term
+    if ctx["material_criticality"] >= 4 and ctx["country"] in HIGH_GEO_RISK_COUNTRIES:
+        actions.append("diversify_suppliers")
+    return actions
+
+
+def _high_actions(ctx: Dict[str, Any]) -> List[str]:
+    """HIGH RISK: Significant risk, proactive measures."""
+    actions = []
+
+    # If near-term delay, increase stock
+    if 0 < ctx["delay_days"] < HIGH_DELAY_DAYS:
+        actions.append("increase_safety_stock")
+
+    # If affected nodes are many (>3), activate alternative
+    if ctx["affected_count"] >= 3:
+        actions.append("activate_alternative_source")
+    else:
+        actions.append("notify_procurement")
+
+    # Monitor if geopolitical risk
+    if ctx["country_risk"] >= 3:
+        actions.append("diversify_suppliers")
+    return actions
+
+
+def _medium_actions(ctx: Dict[str, Any]) -> List[str]:
+    """MEDIUM RISK: Monitor and contingency plan."""
+    return ["notify_procurement", "increase_monitoring"]
+
+
+def _low_actions(ctx: Dict[str, Any]) -> List[str]:
+    """LOW RISK: Monitor only."""
+    return ["increase_monitoring"]
+
+
+# (risk gate, delay gate, service-impact gate, action builder), most severe first.
+# A tier applies when any metric reaches its gate; inf disables a gate.
+RISK_TIERS = [
+    (CRITICAL_RISK_THRESHOLD, CRITICAL_DELAY_DAYS, CRITICAL_SERVICE_IMPACT, _critical_actions),
+    (HIGH_RISK_THRESHOLD, HIGH_DELAY_DAYS, HIGH_SERVICE_IMPACT, _high_actions),
+    (MEDIUM_RISK_THRESHOLD, float("inf"), MEDIUM_SERVICE_IMPACT, _medium_actions),
+]
+LOW_TIER = len(RISK_TIERS)  # index used when no tier gate trips
+
+
+def _tier_indices(severity: np.ndarray, delay_days: np.ndarray, service_impact: np.ndarray) -> np.ndarray:
+    """
+    Index of the first RISK_TIERS entry whose gate trips (LOW_TIER if none), per scenario
+    (np.select keeps the first matching tier).
+    """
+    gates = [
+        (severity >= risk_gate) | (delay_days >= delay_gate) | (service_impact >= service_gate)
+        for risk_gate, delay_gate, service_gate, _ in RISK_TIERS
+    ]
+    return np.select(gates, range(len(RISK_TIERS)), default=LOW_TIER)
+
+
+def _is_downgraded(severity, delay_days, service_impact):
+    """Minimal delay/impact/severity → do_nothing, per scenario."""
+    return (delay_days < 3) & (service_impact < 20) & (severity < MEDIUM_RISK_THRESHOLD)
+
+# Result returned when there is nothing to decide on (timestamp filled in per call)
+_EMPTY_RESULT = {
+    "recommended_actions": [],
+    "overall_confidence": 0.0,
+    "decision_count": 0,
+    "decision_timestamp": None,
+    "top_recommendation": "do_nothing"
+}
+
+_last_timestamp = (0, "")
+
+
+def _utc_timestamp() -> str:
+    """
+    Current UTC time as ISO string, formatted at most once per wall-clock second.
+    Only used for _EMPTY_RESULT; real decisions keep full-resolution timestamps.
+    """
+    global _last_timestamp
+    now = int(time.time())
+    if now != _last_timestamp[0]:
+        _last_timestamp = (now, datetime.fromtimestamp(now, timezone.utc).isoformat())
+    return _last_timestamp[1]
+
 
 class DecisionAgent:
     """Makes autonomous decisions and recommendations based on real-world supply chain factors."""
 
     def __init__(self):
+        self._cache: "OrderedDict[tuple, Dict]" = OrderedDict()
         logger.info("DecisionAgent initialized")
 
-    def calculate_confidence(self, risk: Dict, sim: Dict) -> float:
+    def calculate_confidence(self, risk: Dict, sim: Dict,
+                             material_criticality: Optional[int] = None,
+                             country_risk: Optional[int] = None) -> float:
         """
         Calculate decision confidence based on multiple factors.
         Real-world confidence incorporates: severity, delay, impact, material criticality, country risk.
         Capped at 1.0 (100%).
+        Criticality / country risk are looked up from the risk when not passed in.
         """
-        severity = risk["risk_score"]
-        delay_days = sim["estimated_delay_days"]
-        service_impact = sim["service_level_impact_pct"]
-        material = risk.get("material", "Unknown")
-        country = risk.get("country", "Unknown")
-        
-        # Base confidence from risk severity
-        base_confidence = min(severity, 1.0)
-        
-        # Delay impact factor (0 to 0.2)
-        delay_factor = min(delay_days / CRITICAL_DELAY_DAYS, 1.0) * 0.2
-        
-        # Service impact factor (0 to 0.2)
-        service_factor = min(service_impact / CRITICAL_SERVICE_IMPACT, 1.0) * 0.2
-        
-        # Material criticality factor (0 to 0.2)
-        material_criticality = MATERIAL_CRITICALITY.get(material, 2)
-        criticality_factor = (material_criticality / 5.0) * 0.2
-        
-        # Country geopolitical risk factor (0 to 0.2)
-        country_risk = COUNTRY_GEOPOLITICAL_RISK.get(country, 2)
-        country_factor = (country_risk / 5.0) * 0.2
-        
-        # Total confidence (base + factors, capped at 1.0)
-        total_confidence = min(base_confidence + delay_factor + service_factor + criticality_factor + country_factor, 1.0)
-        
-        return round(total_confidence, 2)
+        if material_criticality is None:
+            material_criticality = MATERIAL_CRITICALITY.get(risk.get("material", "Unknown"), 2)
+        if country_risk is None:
+            country_risk = COUNTRY_GEOPOLITICAL_RISK.get(risk.get("country", "Unknown"), 2)
+
+        return _confidence_batch(*(
+            np.array([value], dtype=np.float64)
+            for value in (risk["risk_score"], sim["estimated_delay_days"], sim["service_level_impact_pct"],
+                          material_criticality, country_risk)
+        ))[0]
+
+    def _scenario_arrays(self, pairs: List[Tuple[Dict, Dict]]) -> Tuple[np.ndarray, ...]:
+        """Struct-of-arrays view of (risk, sim) pairs: severity, delay, impact, criticality, country risk."""
+        n = len(pairs)
+        severity = np.fromiter((r["risk_score"] for r, _ in pairs), dtype=np.float64, count=n)
+        delay_days = np.fromiter((s["estimated_delay_days"] for _, s in pairs), dtype=np.float64, count=n)
+        service_impact = np.fromiter((s["service_level_impact_pct"] for _, s in pairs), dtype=np.float64, count=n)
+        material_criticality = np.fromiter(
+            (MATERIAL_CRITICALITY.get(r.get("material", "Unknown"), 2) for r, _ in pairs), dtype=np.float64, count=n)
+        country_risk = np.fromiter(
+            (COUNTRY_GEOPOLITICAL_RISK.get(r.get("country", "Unknown"), 2) for r, _ in pairs), dtype=np.float64, count=n)
+        return severity, delay_days, service_impact, material_criticality, country_risk
 
     def decide_for_scenario(self, risk: Dict, sim: Dict) -> Dict:
         """
         Determine best action(s) for one risk + simulation pair.
         Uses multi-factor decision logic based on real-world supply chain practices.
         """
+        return self.decide_for_scenarios([(risk, sim)])[0]
+
+    def decide_for_scenarios(self, pairs: List[Tuple[Dict, Dict]]) -> List[Dict]:
+        """
+        Determine best action(s) for many (risk, sim) pairs at once.
+        Confidence, tier and downgrade gates are evaluated as numpy array ops;
+        per-scenario dicts are only built at the end.
+        """
+        if not pairs:
+            return []
+
+        severity, delay_days, service_impact, material_criticality, country_risk = self._scenario_arrays(pairs)
+        confidences = _confidence_batch(severity, delay_days, service_impact, material_criticality, country_risk)
+        tiers = _tier_indices(severity, delay_days, service_impact).tolist()
+        downgrades = _is_downgraded(severity, delay_days, service_impact).tolist()
+
+        scored = zip(confidences, tiers, downgrades, material_criticality.tolist(), country_risk.tolist())
+        return [
+            self._build_decision(risk, sim, confidence, tier, downgrade, criticality, geo_risk)
+            for (risk, sim), (confidence, tier, downgrade, criticality, geo_risk) in zip(pairs, scored)
+        ]
+
+    def _build_decision(self, risk: Dict, sim: Dict, confidence: float, tier: int, downgrade: bool,
+                        material_criticality: float, country_risk: float) -> Dict:
+        """
+        Turn a scored scenario (confidence, tier, downgrade flag) into its decision dict.
+        Criticality / country risk are the values already looked up for scoring.
+        """
         severity = risk["risk_score"]
         delay_days = sim["estimated_delay_days"]
         service_impact = sim["service_level_impact_pct"]
@@ -144,81 +311,40 @@ class DecisionAgent:
         country = risk.get("country", "Unknown")
         disruption_type = sim.get("disruption_type", "Unknown")
         
-        confidence = self.calculate_confidence(risk, sim)
-        actions = []
-        
-        # ──── CRITICAL RISK: Severe impact, immediate action ────
-        if severity >= CRITICAL_RISK_THRESHOLD or \
-           delay_days >= CRITICAL_DELAY_DAYS or \
-           service_impact >= CRITICAL_SERVICE_IMPACT:
-            
-            # Expedite if node failure (structural disruption)
-            if disruption_type == "node_failure":
-                actions.append("expedite_shipment")
-                actions.append("activate_alternative_source")
-            else:
-                # Capacity reduction → increase stock and activate alternatives
-                actions.append("increase_safety_stock")
-                actions.append("activate_alternative_source")
-            
-            # If material is critical, diversify for long-term
-            material_criticality = MATERIAL_CRITICALITY.get(material, 2)
-            if material_criticality >= 4 and country in ["China", "Taiwan"]:
-                actions.append("diversify_suppliers")
-        
-        # ──── HIGH RISK: Significant risk, proactive measures ────
-        elif severity >= HIGH_RISK_THRESHOLD or \
-             delay_days >= HIGH_DELAY_DAYS or \
-             service_impact >= HIGH_SERVICE_IMPACT:
-            
-            # If near-term delay, increase stock
-            if delay_days > 0 and delay_days < HIGH_DELAY_DAYS:
-                actions.append("increase_safety_stock")
-            
-            # If affected nodes are many (>3), activate alternative
-            if affected_count >= 3:
-                actions.append("activate_alternative_source")
-            else:
-                actions.append("notify_procurement")
-            
-            # Monitor if geopolitical risk
-            country_risk = COUNTRY_GEOPOLITICAL_RISK.get(country, 2)
-            if country_risk >= 3:
-                actions.append("diversify_suppliers")
-        
-        # ──── MEDIUM RISK: Monitor and contingency plan ────
-        elif severity >= MEDIUM_RISK_THRESHOLD or service_impact >= MEDIUM_SERVICE_IMPACT:
-            actions.append("notify_procurement")
-            actions.append("increase_monitoring")
-        
-        # ──── LOW RISK: Monitor only ────
+        ctx = {
+            "delay_days": delay_days,
+            "affected_count": affected_count,
+            "country": country,
+            "disruption_type": disruption_type,
+            "material_criticality": material_criticality,
+            "country_risk": country_risk,
+        }
+
+        # ──── Tier cascade: first tier whose gate trips decides the actions ────
+        if tier < LOW_TIER:
+            actions = RISK_TIERS[tier][3](ctx)
         else:
-            actions.append("increase_monitoring")
+            actions = _low_actions(ctx)
         
         # ──── DOWNGRADE for minimal delay/impact ────
-        if delay_days < 3 and service_impact < 20 and severity < MEDIUM_RISK_THRESHOLD:
+        if downgrade:
             actions = ["do_nothing"]
         
         # ──── UPGRADE if material is critical ────
-        material_criticality = MATERIAL_CRITICALITY.get(material, 2)
         if material_criticality >= 4 and "increase_monitoring" in actions:
             actions.remove("increase_monitoring")
             actions.append("notify_procurement")
         
-        # Remove duplicates & maintain urgency order
-        unique_actions = []
-        seen = set()
-        for act in actions:
-            if act not in seen:
-                unique_actions.append(act)
-                seen.add(act)
+        # Remove duplicates (dicts preserve insertion order)
+        unique_actions = list(dict.fromkeys(actions))
         
-        # Sort by urgency descending
-        sorted_actions = sorted(
-            [(act, ACTION_LIBRARY[act]) for act in unique_actions],
-            key=lambda x: x[1]["urgency"],
-            reverse=True
-        )
+        # Order by urgency descending (stable within each urgency bucket)
+        sorted_actions = [
+            (act, ACTION_LIBRARY[act])
+            for level in URGENCY_LEVELS
+            for act in unique_actions
+            if ACTION_LIBRARY[act]["urgency"] == level
+        ]
         
         # Build recommendations with confidence thresholds
         recommendations = [
@@ -233,11 +359,11 @@ class DecisionAgent:
         ]
         
         # Log decision rationale
-        if severity >= HIGH_RISK_THRESHOLD:
+        if severity >= HIGH_RISK_THRESHOLD and logger.isEnabledFor(logging.INFO):
             logger.info(
-                f"High-risk decision for {risk['node_id']}: "
-                f"severity={severity:.2f}, delay={delay_days}d, impact={service_impact:.1f}%, "
-                f"actions={[r['action'] for r in recommendations[:2]]}"
+                "High-risk decision for %s: severity=%.2f, delay=%sd, impact=%.1f%%, actions=%s",
+                risk["node_id"], severity, delay_days, service_impact,
+                [r["action"] for r in recommendations[:2]]
             )
         
         return {
@@ -254,6 +380,52 @@ class DecisionAgent:
             "confidence": confidence
         }
 
+    @staticmethod
+    def _decision_key(risk: Dict, sim: Dict) -> tuple:
+        """Every risk/simulation field decide_for_scenario reads."""
+        return (
+            risk["node_id"],
+            risk["risk_score"],
+            risk.get("name"),
+            risk.get("material"),
+            risk.get("country"),
+            sim["estimated_delay_days"],
+            sim["service_level_impact_pct"],
+            sim["affected_nodes_count"],
+            sim.get("disruption_type"),
+        )
+
+    @staticmethod
+    def _copy_decision(decision: Dict) -> Dict:
+        """Copy of a decision dict (its only nested values are the flat recommendation dicts)."""
+        return {**decision, "recommended_actions": [dict(r) for r in decision["recommended_actions"]]}
+
+    def _cached_decisions(self, pairs: List[Tuple[Dict, Dict]]) -> List[Dict]:
+        """
+        decide_for_scenario over all pairs, reusing results for scenarios seen in earlier runs.
+        The cache holds private copies, so callers (background save, dashboard) can mutate
+        the returned decisions freely.
+        """
+        keys = [self._decision_key(risk, sim) for risk, sim in pairs]
+
+        decisions = []
+        for key in keys:
+            decision = self._cache.get(key)
+            if decision is not None:
+                self._cache.move_to_end(key)
+                decision = self._copy_decision(decision)
+            decisions.append(decision)
+
+        missing = [i for i, decision in enumerate(decisions) if decision is None]
+        fresh = self.decide_for_scenarios([pairs[i] for i in missing])
+        for i, decision in zip(missing, fresh):
+            decisions[i] = decision
+            self._cache[keys[i]] = self._copy_decision(decision)
+            if len(self._cache) > DECISION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+        return decisions
+
     def run(self,
             risks: Dict[str, Any],
             simulation_results: Dict[str, Any]) -> Dict[str, Any]:
@@ -274,27 +446,19 @@ class DecisionAgent:
 
         if not risk_list or not scenarios:
             logger.warning("Missing input data for decision making")
-            return {
-                "recommended_actions": [],
-                "overall_confidence": 0.0,
-                "decision_count": 0,
-                "decision_timestamp": datetime.now(timezone.utc).isoformat(),
-                "top_recommendation": "do_nothing"
-            }
+            return {**_EMPTY_RESULT, "recommended_actions": [], "decision_timestamp": _utc_timestamp()}
+
+        # Index risks by node_id (built in reverse so the first match wins,
+        # same as a linear scan over the severity-sorted risk list)
+        risk_by_id = {r["node_id"]: r for r in reversed(risk_list)}
 
         # Match risks to their simulations (by node_id)
-        decisions = []
-        for sim in scenarios:
-            node_id = sim["node_id"]
-            # Find corresponding risk
-            risk = next((r for r in risk_list if r["node_id"] == node_id), None)
-            if risk:
-                decision = self.decide_for_scenario(risk, sim)
-                decisions.append(decision)
+        pairs = [(risk_by_id[sim["node_id"]], sim) for sim in scenarios if sim["node_id"] in risk_by_id]
+        decisions = self._cached_decisions(pairs)
 
         # Sort by confidence descending (most confident decisions first)
         decisions.sort(
-            key=lambda d: d["confidence"],
+            key=itemgetter("confidence"),
             reverse=True
         )
 
@@ -316,9 +480,8 @@ class DecisionAgent:
         memory.set("decision_result", result)
 
         logger.info(
-            f"Decision process complete | {result['decision_count']} recommendations | "
-            f"overall confidence {overall_confidence:.0%} | "
-            f"top action: {result['top_recommendation']}"
+            "Decision process complete | %d recommendations | overall confidence %.0f%% | top action: %s",
+            result["decision_count"], overall_confidence * 100, result["top_recommendation"]
         )
         return result
 
@@ -352,5 +515,6 @@ if __name__ == "__main__":
         simulation_results=memory.get("simulation_result")
     )
 
-    import json
-    print(json.dumps(result, indent=2))
\ No newline at end of file
+    import sys
+    import orjson
+    sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY) + b"\n")
\ No newline at end of file
@@ -2,15 +2,21 @@
 Graph Agent - Builds and maintains the supply chain dependency graph using NetworkX
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
+from operator import itemgetter
 import networkx as nx
 from datetime import datetime, timezone
 
 from core.memory import memory
+from core.supplier_index import build_supplier_index
 
 logger = logging.getLogger(__name__)
 
+# Supplier materials routed straight to the factory vs. the warehouse
+FACTORY_MATERIALS = frozenset({"Steel", "Semiconductors", "Precision bearings"})
+WAREHOUSE_MATERIALS = frozenset({"Paper pulp", "Nuts & oils"})
+
 
 class GraphAgent:
     """Builds and maintains the supply chain dependency graph."""
@@ -26,18 +32,18 @@ class GraphAgent:
             return
 
         # Add supplier nodes
-        for sup in suppliers:
-            node_id = sup["supplier_id"]
-            self.G.add_node(
-                node_id,
-                type="supplier",
-                name=sup["name"],
-                country=sup["country"],
-                material=sup["material"],
-                capacity=sup["capacity_tons_per_month"],
-                risk_score=sup["risk_country_score"],
-                color="#4CAF50"  # green for suppliers
-            )
+        self.G.add_nodes_from(
+            (sup["supplier_id"], {
+                "type": "supplier",
+                "name": sup["name"],
+                "country": sup["country"],
+                "material": sup["material"],
+                "capacity": sup["capacity_tons_per_month"],
+                "risk_score": sup["risk_country_score"],
+                "color": "#4CAF50",  # green for suppliers
+            })
+            for sup in suppliers
+        )
 
         # Add fictional downstream nodes (for realistic chain)
         downstream = [
@@ -46,51 +52,74 @@ class GraphAgent:
             {"id": "C001", "type": "customer", "name": "Global Retail Customer", "color": "#9C27B0"},
         ]
 
-        for ds in downstream:
-            self.G.add_node(ds["id"], type=ds["type"], name=ds["name"], color=ds["color"])
+        self.G.add_nodes_from(
+            (ds["id"], {"type": ds["type"], "name": ds["name"], "color": ds["color"]})
+            for ds in downstream
+        )
 
         # Create realistic dependencies (directed edges: supplier → consumer)
         # For simplicity: most suppliers → factory, factory → warehouse, warehouse → customer
+        edges = []
         for sup in suppliers:
             sup_id = sup["supplier_id"]
 
             # 80% go directly to factory
-            if sup["material"] in ["Steel", "Semiconductors", "Precision bearings"]:
-                self.G.add_edge(sup_id, "F001", material=sup["material"], weight=1.0)
+            if sup["material"] in FACTORY_MATERIALS:
+                edges.append((sup_id, "F001", {"material": sup["material"], "weight": 1.0}))
 
             # Some go to warehouse directly (e.g. packaging/nuts)
-            if sup["material"] in ["Paper pulp", "Nuts & oils"]:
-                self.G.add_edge(sup_id, "W001", material=sup["material"], weight=0.8)
+            if sup["material"] in WAREHOUSE_MATERIALS:
+                edges.append((sup_id, "W001", {"material": sup["material"], "weight": 0.8}))
 
         # Factory → Warehouse → Customer (core chain)
-        self.G.add_edge("F001", "W001", material="Assembled Products", weight=1.0)
-        self.G.add_edge("W001", "C001", material="Finished Goods", weight=1.0)
+        edges.append(("F001", "W001", {"material": "Assembled Products", "weight": 1.0}))
+        edges.append(("W001", "C001", {"material": "Finished Goods", "weight": 1.0}))
+
+        self.G.add_edges_from(edges)
 
-        logger.info(f"Graph built: {self.G.number_of_nodes()} nodes, {self.G.number_of_edges()} edges")
+        logger.info("Graph built: %d nodes, %d edges", self.G.number_of_nodes(), self.G.number_of_edges())
 
     def get_graph_stats(self) -> Dict[str, Any]:
         """Compute basic graph metrics."""
-        if self.G.number_of_nodes() == 0:
+        # Single pass over the node dict for node + supplier counts
+        node_count = 0
+        supplier_count = 0
+        for _, data in self.G.nodes(data=True):
+            node_count += 1
+            if data["type"] == "supplier":
+                supplier_count += 1
+
+        if node_count == 0:
             return {"valid": False}
 
+        # Every edge adds one to an out-degree and one to an in-degree
+        edge_count = self.G.number_of_edges()
+        is_dag = nx.is_directed_acyclic_graph(self.G)
+
         return {
             "valid": True,
-            "node_count": self.G.number_of_nodes(),
-            "edge_count": self.G.number_of_edges(),
-            "supplier_count": len([n for n, d in self.G.nodes(data=True) if d["type"] == "supplier"]),
-            "has_cycles": nx.is_directed_acyclic_graph(self.G) is False,
-            "critical_nodes": self._find_critical_nodes(),
-            "avg_degree": sum(d for n, d in self.G.degree()) / self.G.number_of_nodes() if self.G.number_of_nodes() else 0
+            "node_count": node_count,
+            "edge_count": edge_count,
+            "supplier_count": supplier_count,
+            "has_cycles": not is_dag,
+            "critical_nodes": self._find_critical_nodes(is_dag),
+            "avg_degree": 2 * edge_count / node_count
         }
 
-    def _find_critical_nodes(self) -> List[str]:
+    def _find_critical_nodes(self, is_dag: Optional[bool] = None) -> List[str]:
         """Simple heuristic: nodes with high out-degree or on longest path."""
-        try:
-            longest_path = nx.dag_longest_path(self.G)
-            return longest_path[:3]  # first few are usually most critical upstream
-        except:
-            # Fallback: high degree nodes
-            return [n for n, d in sorted(self.G.out_degree(), key=lambda x: x[1], reverse=True)[:3]]
+        if is_dag is None:
+            is_dag = nx.is_directed_acyclic_graph(self.G)
+
+        if is_dag:
+            try:
+                longest_path = nx.dag_longest_path(self.G)
+                return longest_path[:3]  # first few are usually most critical upstream
+            except nx.NetworkXUnfeasible:
+                pass
+
+        # Fallback: high degree nodes
+        return [n for n, d in sorted(self.G.out_degree(), key=itemgetter(1), reverse=True)[:3]]
 
     def run(self, suppliers_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -115,9 +144,10 @@ class GraphAgent:
 
         # Store the actual graph object in shared memory for downstream agents
         memory.set("supply_chain_graph", self.G)
+        memory.set("supplier_index", build_supplier_index(self.G))
         memory.set("graph_result", result)
 
-        logger.info(f"Graph construction complete | {result['node_count']} nodes | {result['edge_count']} edges")
+        logger.info("Graph construction complete | %d nodes | %d edges", result["node_count"], result["edge_count"])
         return result
 
 
@@ -134,8 +164,9 @@ if __name__ == "__main__":
     agent = GraphAgent()
     output = agent.run(suppliers)
 
-    import json
-    print(json.dumps(output, indent=2))
+    import sys
+    import orjson
+    sys.stdout.buffer.write(orjson.dumps(output, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY) + b"\n")
 
     # Optional: print basic graph summary
     print("\nNodes:")
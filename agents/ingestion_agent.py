@@ -2,12 +2,11 @@
 Ingestion Agent - Collects supplier master data and global risk-related news
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
-import pandas as pd
-import requests
+import os
+import csv
 from datetime import datetime, timezone   # ← add timezone here
-from newspaper import Article, ArticleException
 
 logger = logging.getLogger(__name__)
 
@@ -27,42 +26,75 @@ KEYWORDS = [
     "tariff", "freight", "logistics", "shipping delay", "winter weather", "Chinese New Year"
 ]
 
+REQUIRED_SUPPLIER_FIELDS = ("supplier_id", "name", "country", "material")
+
+
+def _to_number(value: Any, default: Any = None) -> Any:
+    """Parse a CSV cell as int (or float), falling back to default when blank/invalid."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
 class IngestionAgent:
     """Handles data collection from multiple sources."""
 
     def __init__(self):
-        import os
         PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.suppliers_path = os.path.join(PROJECT_ROOT, "data", "suppliers.csv")
+        # Parsed suppliers, reused until the CSV's mtime changes
+        self._suppliers_cache: Optional[List[Dict[str, Any]]] = None
+        self._suppliers_mtime: Optional[float] = None
         logger.info("IngestionAgent initialized")
 
     def load_suppliers(self) -> List[Dict[str, Any]]:
-        """Load and validate supplier master data from CSV."""
+        """Load and validate supplier master data from CSV (cached until the file changes)."""
         try:
-            df = pd.read_csv(self.suppliers_path)
+            mtime = os.path.getmtime(self.suppliers_path)
+            if self._suppliers_cache is not None and mtime == self._suppliers_mtime:
+                return [dict(sup) for sup in self._suppliers_cache]
+
+            with open(self.suppliers_path, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+
             # Basic cleaning & type conversion
-            df = df.dropna(subset=["supplier_id", "name", "country", "material"])
-            df["risk_country_score"] = pd.to_numeric(df["risk_country_score"], errors="coerce").fillna(0.3)
-            suppliers = df.to_dict("records")
-            logger.info(f"Loaded {len(suppliers)} suppliers from {self.suppliers_path}")
-            return suppliers
+            suppliers = []
+            for row in rows:
+                if not all(row.get(key) for key in REQUIRED_SUPPLIER_FIELDS):
+                    continue
+                row["capacity_tons_per_month"] = _to_number(row.get("capacity_tons_per_month"))
+                row["risk_country_score"] = float(_to_number(row.get("risk_country_score"), 0.3))
+                suppliers.append(row)
+            logger.info("Loaded %d suppliers from %s", len(suppliers), self.suppliers_path)
+
+            self._suppliers_cache = suppliers
+            self._suppliers_mtime = mtime
+            return [dict(sup) for sup in suppliers]
         except FileNotFoundError:
-            logger.error(f"Suppliers file not found: {self.suppliers_path}")
+            logger.error("Suppliers file not found: %s", self.suppliers_path)
             return []
         except Exception as e:
-            logger.error(f"Error loading suppliers: {e}")
+            logger.error("Error loading suppliers: %s", e)
             return []
 
-    def fetch_recent_news(self, max_articles: int = 12) -> list:
-        """Fetch real relevant news from RSS feeds."""
-        from core.news_fetcher import fetch_recent_news
+    def fetch_recent_news(self, max_articles: int = 12, queries: Optional[List[str]] = None) -> list:
+        """Fetch real relevant news (several queries are fetched concurrently)."""
+        from core.news_fetcher import fetch_recent_news, fetch_recent_news_many
 
         try:
-            articles = fetch_recent_news(max_articles=max_articles)  # ← Change 'max_total' to 'max_articles'
-            logger.info(f"Collected {len(articles)} relevant real news items from RSS")
+            if queries:
+                articles = fetch_recent_news_many(queries, max_articles=max_articles)
+            else:
+                articles = fetch_recent_news(max_articles=max_articles)  # ← Change 'max_total' to 'max_articles'
+            logger.info("Collected %d relevant real news items from RSS", len(articles))
             return articles
         except Exception as e:
-            logger.error(f"News fetching failed: {e}")
+            logger.error("News fetching failed: %s", e)
             return []
     def run(self, config: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -71,20 +103,21 @@ class IngestionAgent:
         """
         config = config or {}
         max_news = config.get("max_news_articles", 8)
+        news_queries = config.get("news_queries")
 
         suppliers = self.load_suppliers()
-        news_items = self.fetch_recent_news(max_articles=max_news)
+        news_items = self.fetch_recent_news(max_articles=max_news, queries=news_queries)
 
         result = {
             "suppliers": suppliers,
             "news_items": news_items,
-            "ingestion_timestamp": datetime.utcnow().isoformat(),
+            "ingestion_timestamp": datetime.now(timezone.utc).isoformat(),
             "sources_checked": len(RSS_FEEDS),
             "suppliers_count": len(suppliers),
             "news_count": len(news_items)
         }
 
-        logger.info(f"Ingestion complete | {result['suppliers_count']} suppliers | {result['news_count']} news items")
+        logger.info("Ingestion complete | %d suppliers | %d news items", result["suppliers_count"], result["news_count"])
         return result
 
 
@@ -93,5 +126,6 @@ if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     agent = IngestionAgent()
     output = agent.run()
-    import json
-    print(json.dumps(output, indent=2))
\ No newline at end of file
+    import sys
+    import orjson
+    sys.stdout.buffer.write(orjson.dumps(output, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY) + b"\n")
\ No newline at end of file
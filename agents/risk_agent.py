@@ -3,13 +3,21 @@ Risk Agent - Detects supply chain risks by matching news to graph entities
 """
 
 from typing import Dict, Any, List, Optional
+from dataclasses import dataclass
 import logging
 from datetime import datetime, timezone
 import re
 
 import networkx as nx
+import numpy as np
+
+try:
+    import ahocorasick  # pyahocorasick, optional
+except ImportError:
+    ahocorasick = None
 
 from core.memory import memory
+from core.supplier_index import build_supplier_index, match_suppliers
 
 logger = logging.getLogger(__name__)
 
@@ -41,54 +49,209 @@ MATERIAL_SENSITIVITY = {
     "Precision bearings": ["outage", "shortage"],
 }
 
+# Country mentions (expand as needed) — whole words only
+COUNTRY_KEYWORDS = {
+    "China": ["china", "chinese"],
+    "Taiwan": ["taiwan"],
+    "Brazil": ["brazil", "brasil"],
+    "Sweden": ["sweden", "swedish"],
+    "Germany": ["germany", "german"],
+}
+
+# Material mentions (from your suppliers) — (keywords matched at a word start, keywords matched anywhere)
+MATERIAL_KEYWORDS = {
+    "Semiconductors": (["semiconductor"], ["chip", "semicon"]),
+    "Steel": (["steel"], ["iron"]),
+    "Paper pulp": (["pulp"], ["paper"]),
+    "Nuts & oils": (["nuts"], ["oils", "oil"]),
+    "Precision bearings": (["bearing"], ["bearings"]),
+}
+
+
+# Integer ids for the country/material tables, so batch scoring is array indexing.
+# The last slot of each array stands for "not in the tables".
+RISK_TYPE_BIT = {rtype: 1 << i for i, rtype in enumerate(RISK_PATTERNS)}
+COUNTRY_ID = {c: i for i, c in enumerate(dict.fromkeys([*COUNTRY_RISK_BASE, *COUNTRY_KEYWORDS]))}
+MATERIAL_ID = {m: i for i, m in enumerate(dict.fromkeys([*MATERIAL_SENSITIVITY, *MATERIAL_KEYWORDS]))}
+COUNTRY_RISK_ARR = np.array([COUNTRY_RISK_BASE.get(c, 0.3) for c in COUNTRY_ID] + [0.3])
+# Bit k set iff the material is sensitive to the k-th risk type
+MATERIAL_SENSITIVITY_MASK = np.array(
+    [sum(bit for rtype, bit in RISK_TYPE_BIT.items() if rtype in MATERIAL_SENSITIVITY.get(m, ()))
+     for m in MATERIAL_ID] + [0], dtype=np.int64)
+_POPCOUNT = np.array([bin(mask).count("1") for mask in range(1 << len(RISK_PATTERNS))], dtype=np.int64)
+
+
+def _keyword_specs():
+    """(kind, label, keyword, word boundary before, word boundary after) for every keyword."""
+    for rtype, words in RISK_PATTERNS.items():
+        for word in words:
+            yield "risk", rtype, word, True, True
+    for country, words in COUNTRY_KEYWORDS.items():
+        for word in words:
+            yield "country", country, word, True, True
+    for material, (word_start, anywhere) in MATERIAL_KEYWORDS.items():
+        for word in word_start:
+            yield "material", material, word, True, False
+        for word in anywhere:
+            yield "material", material, word, False, False
+
+
+# One combined matcher for risk keywords, countries and materials, compiled at import.
+# With pyahocorasick installed this is a case-folded keyword trie (Aho-Corasick automaton)
+# whose hits are checked against the same word boundaries \b would enforce.
+# Otherwise it is one regex: every label is a named group and the zero-width lookahead
+# reports a hit at every text position, so a single finditer pass finds each label.
+def _compile_automaton():
+    """Keyword → [(kind, label, length, boundary before, boundary after)] automaton, or None."""
+    if ahocorasick is None:
+        return None
+    entries: Dict[str, list] = {}
+    for kind, label, word, before, after in _keyword_specs():
+        entries.setdefault(word, []).append((kind, label, len(word), before, after))
+    automaton = ahocorasick.Automaton()
+    for word, values in entries.items():
+        automaton.add_word(word, values)
+    automaton.make_automaton()
+    return automaton
+
+
+def _compile_matcher():
+    """Build the combined keyword regex and its group name → (kind, label) map."""
+    alternatives_by_label: Dict[tuple, list] = {}
+    for kind, label, word, before, after in _keyword_specs():
+        alternatives_by_label.setdefault((kind, label), []).append(
+            (r'\b' if before else '') + re.escape(word) + (r'\b' if after else ''))
+    groups = {}
+    alternatives = []
+    for (kind, label), alts in alternatives_by_label.items():
+        name = f"g{len(groups)}"
+        groups[name] = (kind, label)
+        alternatives.append(f"(?P<{name}>" + "|".join(alts) + ")")
+    return re.compile("(?=" + "|".join(alternatives) + ")"), groups
+
+
+_KEYWORD_AUTOMATON = _compile_automaton()
+_MATCHER, _MATCHER_GROUPS = _compile_matcher()
+
+
+def _is_word_char(c: str) -> bool:
+    # Same definition of a word character as re's \b for str patterns
+    return c.isalnum() or c == "_"
+
+
+def _scan(text_lower: str) -> Dict[str, set]:
+    """Single pass over lowercased text → {"risk": {...}, "country": {...}, "material": {...}}."""
+    hits = {"risk": set(), "country": set(), "material": set()}
+    if _KEYWORD_AUTOMATON is not None:
+        last = len(text_lower) - 1
+        for end, values in _KEYWORD_AUTOMATON.iter(text_lower):
+            for kind, label, length, before, after in values:
+                start = end - length + 1
+                if before and start > 0 and _is_word_char(text_lower[start - 1]):
+                    continue
+                if after and end < last and _is_word_char(text_lower[end + 1]):
+                    continue
+                hits[kind].add(label)
+        return hits
+    for m in _MATCHER.finditer(text_lower):
+        kind, label = _MATCHER_GROUPS[m.lastgroup]
+        hits[kind].add(label)
+    return hits
+
+
+@dataclass(slots=True)
+class PreparedText:
+    """
+    Lowercased title + summary of one news item and its keyword hits, computed once.
+    The keyword scan runs on first use, so news matching no supplier never pays for it.
+    """
+    lower: str
+    hits: Optional[Dict[str, set]] = None
+
+    def keyword_hits(self) -> Dict[str, set]:
+        if self.hits is None:
+            self.hits = _scan(self.lower)
+        return self.hits
+
+
+def prepare_text(news_item: Dict) -> PreparedText:
+    """Lowercase a news item's title + summary once for every downstream matcher."""
+    title = str(news_item.get("title") or "").lower()
+    summary = str(news_item.get("summary") or "").lower()
+    return PreparedText(title + " " + summary)
+
+
+def _scoring_ids(index: Dict[str, Any]):
+    """
+    (country ids, material ids) of the indexed suppliers for array scoring;
+    computed on first use and kept on the index.
+    """
+    ids = index.get("scoring_ids")
+    if ids is None:
+        ids = index["scoring_ids"] = (
+            np.array([COUNTRY_ID.get(c, len(COUNTRY_ID)) for c in index["countries"]], dtype=np.intp),
+            np.array([MATERIAL_ID.get(m, len(MATERIAL_ID)) for m in index["materials"]], dtype=np.intp),
+        )
+    return ids
+
+
+def _score_suppliers(index: Dict[str, Any], positions: List[int], news_item: Dict,
+                     risk_types: List[str], entities: Dict[str, List[str]]) -> List[float]:
+    """Vectorized RiskAgent.score_risk for one news item over the given supplier positions."""
+    pos = np.asarray(positions, dtype=np.intp)
+    country_ids, material_ids = _scoring_ids(index)
+    country_id = country_ids[pos]
+    material_id = material_ids[pos]
+    risk_bits = 0
+    for rtype in risk_types:
+        risk_bits |= RISK_TYPE_BIT.get(rtype, 0)
+
+    base = COUNTRY_RISK_ARR[country_id]
+    base = base + 0.25 * _POPCOUNT[MATERIAL_SENSITIVITY_MASK[material_id] & risk_bits]
+    base = base + news_item.get("relevance_score", 0.5) * 0.3
+    base = base + 0.15 * np.isin(country_id, [COUNTRY_ID[c] for c in entities["countries"]])
+    base = base + 0.20 * np.isin(material_id, [MATERIAL_ID[m] for m in entities["materials"]])
+    return [min(round(b, 2), 1.0) for b in base.tolist()]
+
+
 class RiskAgent:
     """Detects and scores risks based on news & graph context."""
 
     def __init__(self):
         logger.info("RiskAgent initialized")
 
+    @staticmethod
+    def _risk_types_from(hits: Dict[str, set]) -> List[str]:
+        detected = hits["risk"]
+        return list(detected) if detected else ["general"]
+
+    @staticmethod
+    def _entities_from(hits: Dict[str, set]) -> Dict[str, List[str]]:
+        return {
+            "countries": [c for c in COUNTRY_KEYWORDS if c in hits["country"]],
+            "materials": [m for m in MATERIAL_KEYWORDS if m in hits["material"]],
+        }
+
     def extract_risk_types(self, text: str) -> List[str]:
         """Identify main risk categories from news text (title + summary)."""
-        text_lower = text.lower()
-        detected = set()
-        for rtype, words in RISK_PATTERNS.items():
-            if any(re.search(r'\b' + re.escape(word) + r'\b', text_lower) for word in words):
-                detected.add(rtype)
-        return list(detected) if detected else ["general"]
+        return self._risk_types_from(_scan(text.lower()))
 
     def extract_entities(self, text: str) -> Dict[str, List[str]]:
         """Simple entity extraction for countries and materials."""
-        text_lower = text.lower()
-        entities = {"countries": [], "materials": []}
-
-        # Countries (expand as needed)
-        country_patterns = {
-            "China": r'\bchina\b|\bchinese\b',
-            "Taiwan": r'\btaiwan\b',
-            "Brazil": r'\bbrazil\b|\bbrasil\b',
-            "Sweden": r'\bsweden\b|\bswedish\b',
-            "Germany": r'\bgermany\b|\bgerman\b',
-        }
-        for country, pattern in country_patterns.items():
-            if re.search(pattern, text_lower):
-                entities["countries"].append(country)
-
-        # Materials (from your suppliers)
-        material_patterns = {
-            "Semiconductors": r'\bsemiconductor|chip|semicon',
-            "Steel": r'\bsteel|iron',
-            "Paper pulp": r'\bpulp|paper',
-            "Nuts & oils": r'\bnuts|oils|oil',
-            "Precision bearings": r'\bbearing|bearings',
-        }
-        for mat, pattern in material_patterns.items():
-            if re.search(pattern, text_lower):
-                entities["materials"].append(mat)
+        return self._entities_from(_scan(text.lower()))
 
-        return entities
+    def analyze_text(self, text: str):
+        """Risk types and entities from a single scan of the text → (risk_types, entities)."""
+        hits = _scan(text.lower())
+        return self._risk_types_from(hits), self._entities_from(hits)
 
-    def score_risk(self, news_item: Dict, node_data: Dict) -> float:
-        """Calculate risk score 0.0–1.0 for a specific node given a news item."""
+    def score_risk(self, news_item: Dict, node_data: Dict,
+                   risk_types: Optional[List[str]] = None,
+                   entities: Optional[Dict[str, List[str]]] = None) -> float:
+        """
+        Calculate risk score 0.0–1.0 for a specific node given a news item.
+        Pass risk_types/entities (from analyze_text) to skip re-scanning the news text.
+        """
         base = 0.0
 
         # 1. Country risk (baseline)
@@ -97,8 +260,9 @@ class RiskAgent:
 
         # 2. Material sensitivity
         material = node_data.get("material", "")
-        full_text = (news_item.get("title", "") + " " + news_item.get("summary", "")).lower()
-        risk_types = self.extract_risk_types(full_text)
+        if risk_types is None or entities is None:
+            full_text = (news_item.get("title", "") + " " + news_item.get("summary", "")).lower()
+            risk_types, entities = self.analyze_text(full_text)
 
         for rtype in risk_types:
             if material in MATERIAL_SENSITIVITY and rtype in MATERIAL_SENSITIVITY[material]:
@@ -108,7 +272,6 @@ class RiskAgent:
         base += news_item.get("relevance_score", 0.5) * 0.3
 
         # 4. Entity match boost (stronger if direct match)
-        entities = self.extract_entities(full_text)
         if country in entities["countries"]:
             base += 0.15
         if material in entities["materials"]:
@@ -120,45 +283,47 @@ class RiskAgent:
         # Log for debugging
         if final_score > 0.7:
             logger.debug(f"High risk score {final_score} for {node_data.get('name')} "
-                         f"from news: {news_item.get('title')[:60]}...")
+                         f"from news: {(news_item.get('title') or '')[:60]}...")
 
         return final_score
 
-    def find_affected_nodes(self, G: nx.DiGraph, news_item: Dict) -> List[Dict]:
+    def find_affected_nodes(self, G: nx.DiGraph, news_item: Dict,
+                            index: Optional[Dict[str, Any]] = None,
+                            prepared: Optional[PreparedText] = None) -> List[Dict]:
         """Match news to graph nodes (focus on suppliers)."""
-        title = str(news_item.get("title") or "").lower()
-        summary = str(news_item.get("summary") or "").lower()
-        full_text = title + " " + summary
-        affected = []
+        if index is None:
+            index = build_supplier_index(G)
+        if prepared is None:
+            prepared = prepare_text(news_item)
 
-        for node, data in G.nodes(data=True):
-            if data.get("type") != "supplier":
-                continue  # Focus on suppliers for now
-
-            country = data.get("country", "").lower()
-            material = data.get("material", "").lower()
-            name = data.get("name", "").lower()
-
-            # Match if any direct keyword appears in news text
-            country_match = any(c.lower() in full_text for c in [country, country + 'ese'])  # e.g. "Chinese"
-            material_match = any(m.lower() in full_text for m in [material, material.lower().replace(" ", ""),
-                                                                  material.split()[
-                                                                      0]])  # e.g. "semi conductor" → "semiconductor"
-            name_match = name.lower() in full_text or any(word in full_text for word in name.lower().split())
-
-            if country_match or material_match or name_match:
-                score = self.score_risk(news_item, data)
-                affected.append({
-                    "node_id": node,
-                    "name": data.get("name"),
-                    "country": data.get("country"),
-                    "material": data.get("material"),
-                    "risk_score": score,
-                    "risk_types": self.extract_risk_types(full_text),
-                    "news_title": news_item.get("title"),
-                    "news_summary": news_item.get("summary", ""),
-                    "news_url": news_item.get("url", ""),
-                })
+        affected = []
+        positions = match_suppliers(index, prepared.lower)
+        if not positions:
+            return affected
+
+        # Keyword hits come from the one scan in prepare_text, shared by every matched supplier
+        hits = prepared.keyword_hits()
+        risk_types = self._risk_types_from(hits)
+        entities = self._entities_from(hits)
+        scores = _score_suppliers(index, positions, news_item, risk_types, entities)
+
+        suppliers = index["suppliers"]
+        for pos, score in zip(positions, scores):
+            node, data = suppliers[pos]
+            if score > 0.7 and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("High risk score %s for %s from news: %s...",
+                             score, data.get("name"), (news_item.get("title") or "")[:60])
+            affected.append({
+                "node_id": node,
+                "name": data.get("name"),
+                "country": data.get("country"),
+                "material": data.get("material"),
+                "risk_score": score,
+                "risk_types": list(risk_types),
+                "news_title": news_item.get("title"),
+                "news_summary": news_item.get("summary", ""),
+                "news_url": news_item.get("url", ""),
+            })
 
         return affected
 
@@ -175,23 +340,35 @@ class RiskAgent:
             return {"risks_detected": [], "max_severity": 0.0}
 
         all_risks = []
-        max_severity = 0.0
 
-        for news in news_items:
-            affected_nodes = self.find_affected_nodes(G, news)
-            for aff in affected_nodes:
-                all_risks.append(aff)
-                max_severity = max(max_severity, aff["risk_score"])
+        # Canonical supplier strings are precomputed once per graph by GraphAgent
+        index = memory.get("supplier_index")
+        if index is None or index["graph"] is not G:
+            index = build_supplier_index(G)
+            memory.set("supplier_index", index)
 
-        # Sort by severity descending
-        all_risks.sort(key=lambda x: x["risk_score"], reverse=True)
+        # News that mentions no supplier short-circuits before the keyword scan and scoring
+        news_skipped = 0
+        for news in news_items:
+            # Each news item is lowercased once; the keyword scan only runs once a supplier matched
+            affected_nodes = self.find_affected_nodes(G, news, index, prepare_text(news))
+            if affected_nodes:
+                all_risks.extend(affected_nodes)
+            else:
+                news_skipped += 1
+
+        # Sort by severity descending (stable, so ties keep detection order)
+        scores = np.fromiter((r["risk_score"] for r in all_risks), dtype=float, count=len(all_risks))
+        all_risks = [all_risks[i] for i in np.argsort(-scores, kind="stable")]
+        max_severity = float(scores.max()) if len(scores) else 0.0
 
         result = {
             "risks_detected": all_risks,
             "max_severity": round(max_severity, 2),
             "total_risks_found": len(all_risks),
             "analysis_timestamp": datetime.now(timezone.utc).isoformat(),
-            "news_analyzed": len(news_items)
+            "news_analyzed": len(news_items),
+            "news_skipped_no_supplier_match": news_skipped,
         }
 
         memory.set("risk_result", result)
@@ -222,5 +399,6 @@ if __name__ == "__main__":
         graph_info=memory.get("graph_result")
     )
 
-    import json
-    print(json.dumps(risk_result, indent=2))
\ No newline at end of file
+    import sys
+    import orjson
+    sys.stdout.buffer.write(orjson.dumps(risk_result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY) + b"\n")
\ No newline at end of file
@@ -3,10 +3,14 @@ Simulation Agent - Performs what-if failure simulations on the supply chain grap
 """
 
 from typing import Dict, Any, List, Optional
+import heapq
 import logging
+from operator import itemgetter
 from datetime import datetime, timezone
 
 import networkx as nx
+import numpy as np
+from scipy.sparse.csgraph import shortest_path
 
 from core.memory import memory
 
@@ -16,6 +20,7 @@ logger = logging.getLogger(__name__)
 DEFAULT_DELAY_DAYS_PER_LEVEL = 3      # days added per hop downstream
 CAPACITY_REDUCTION_SEVERE = 0.8       # 80% capacity loss for severe risks
 CAPACITY_REDUCTION_MODERATE = 0.4     # 40% for moderate
+MAX_SIMULATED_RISKS = 5               # only the most severe risks are simulated
 
 
 class SimulationAgent:
@@ -23,6 +28,9 @@ class SimulationAgent:
 
     def __init__(self):
         self.G: Optional[nx.DiGraph] = None
+        self._csr = None                 # CSR adjacency of self.G (built once per graph)
+        self._csr_source = None          # graph the CSR was built from
+        self._node_index: Dict[Any, int] = {}
         logger.info("SimulationAgent initialized")
 
     def load_graph(self):
@@ -30,6 +38,22 @@ class SimulationAgent:
         self.G = memory.get("supply_chain_graph")
         if self.G is None or self.G.number_of_nodes() == 0:
             raise ValueError("No valid graph found in memory for simulation")
+        self._build_adjacency()
+
+    def _build_adjacency(self):
+        """Materialize self.G as an unweighted CSR matrix plus a node → row index map."""
+        nodelist = list(self.G)
+        self._node_index = {node: i for i, node in enumerate(nodelist)}
+        self._csr = nx.to_scipy_sparse_array(self.G, nodelist=nodelist, weight=None, format="csr")
+        self._csr_source = self.G
+
+    def _hop_levels(self, node_id) -> np.ndarray:
+        """Hop distance from node_id to every node it reaches (itself included), via one C BFS."""
+        if self._csr_source is not self.G:
+            self._build_adjacency()
+        dist = shortest_path(self._csr, method="D", directed=True, unweighted=True,
+                             indices=self._node_index[node_id])
+        return dist[np.isfinite(dist)].astype(np.int64)
 
     def simulate_single_risk(self, risk: Dict[str, Any]) -> Dict[str, Any]:
         """Simulate impact of one specific risk event."""
@@ -50,40 +74,29 @@ class SimulationAgent:
             capacity_loss = 0.2
             delay_multiplier = 0.7
 
-        # Create a temporary copy for simulation
-        sim_G = self.G.copy()
+        # Downstream impact depends only on the pre-disruption topology, so the
+        # disruption is applied logically instead of on a copy of the graph:
+        # a failed node reaches nothing, a capacity cut leaves reachability intact.
+        node_failed = severity >= 0.9 and node_id in self.G
+        disruption_type = "node_failure" if node_failed else "capacity_reduction"
 
-        # Apply disruption: reduce capacity or remove node if severe
-        if severity >= 0.9 and node_id in sim_G:
-            sim_G.remove_node(node_id)
-            disruption_type = "node_failure"
-        else:
-            # Reduce capacity on affected node
-            if "capacity" in sim_G.nodes[node_id]:
-                orig_cap = sim_G.nodes[node_id]["capacity"]
-                sim_G.nodes[node_id]["capacity"] = max(0, orig_cap * (1 - capacity_loss))
-            disruption_type = "capacity_reduction"
+        # One BFS over the original topology: hop distance to every downstream node
+        levels = self._hop_levels(node_id)
+        original_reachable = len(levels)
 
         # Find all downstream affected nodes (including the disrupted one)
-        try:
-            affected = list(nx.descendants(sim_G, node_id)) + [node_id]
-        except nx.NetworkXError:
-            # Node already removed or not present
-            affected = [node_id]
+        if node_failed:
+            affected_count = 1
+            max_level = 0
+        else:
+            affected_count = original_reachable
+            max_level = int(levels.max())
 
         # Estimate delay propagation
-        max_delay = 0
-        for target in affected:
-            try:
-                path_len = nx.shortest_path_length(self.G, node_id, target)
-                delay = path_len * DEFAULT_DELAY_DAYS_PER_LEVEL * delay_multiplier
-                max_delay = max(max_delay, delay)
-            except nx.NetworkXNoPath:
-                continue
+        max_delay = max(0, max_level * DEFAULT_DELAY_DAYS_PER_LEVEL * delay_multiplier)
 
         # Rough service level impact (percentage of downstream nodes still reachable)
-        original_reachable = len(list(nx.descendants(self.G, node_id))) + 1
-        sim_reachable = len(affected) if disruption_type == "capacity_reduction" else 1
+        sim_reachable = affected_count if disruption_type == "capacity_reduction" else 1
         service_impact_pct = round((1 - sim_reachable / original_reachable) * 100, 1) if original_reachable > 0 else 100.0
 
         return {
@@ -92,7 +105,7 @@ class SimulationAgent:
             "severity_used": severity,
             "capacity_loss_pct": round(capacity_loss * 100),
             "estimated_delay_days": round(max_delay, 1),
-            "affected_nodes_count": len(affected),
+            "affected_nodes_count": affected_count,
             "service_level_impact_pct": service_impact_pct,
             "news_title": risk.get("news_title", "Unknown"),
             "simulated_at": datetime.now(timezone.utc).isoformat()
@@ -118,8 +131,8 @@ class SimulationAgent:
         worst_delay = 0
         total_affected = set()
 
-        # Simulate only top 5 most severe risks (to keep it fast)
-        for risk in sorted(risk_list, key=lambda x: x["risk_score"], reverse=True)[:5]:
+        # Simulate only top 5 most severe risks (to keep it fast); partial selection, no full sort
+        for risk in heapq.nlargest(MAX_SIMULATED_RISKS, risk_list, key=itemgetter("risk_score")):
             scenario = self.simulate_single_risk(risk)
             scenarios.append(scenario)
 
@@ -166,5 +179,6 @@ if __name__ == "__main__":
         risks=memory.get("risk_result")
     )
 
-    import json
-    print(json.dumps(result, indent=2))
\ No newline at end of file
+    import sys
+    import orjson
+    sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY) + b"\n")
\ No newline at end of file
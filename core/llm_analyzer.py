@@ -1,71 +1,144 @@
 # core/llm_analyzer.py
 from typing import List, Dict, Any
+import contextlib
 import logging
+import os
 from transformers import pipeline
 
+try:
+    import torch
+except ImportError:  # transformers can run on other backends
+    torch = None
+
 logger = logging.getLogger(__name__)
 
+RISK_LABELS = ["high supply chain risk", "geopolitical risk", "natural disaster risk", "economic risk", "low risk"]
+MAX_TEXT_CHARS = 512
+SENTIMENT_BATCH_SIZE = 16
+ZERO_SHOT_BATCH_SIZE = 8
+
+# Opt-in dynamic int8 ONNX Runtime models for CPU inference (needs optimum[onnxruntime])
+USE_ONNX_INT8 = os.getenv("LLM_ONNX_INT8", "").lower() in ("1", "true", "yes")
+ONNX_CACHE_DIR = os.getenv("LLM_ONNX_CACHE_DIR", os.path.join("data", "onnx_models"))
+
 # Load small models once (lazy loading)
 sentiment_pipeline = None
 zero_shot_pipeline = None
 
+def _pipeline_kwargs() -> Dict[str, Any]:
+    """Half precision on GPU; CPU keeps the default fp32 weights."""
+    if torch is not None and torch.cuda.is_available():
+        return {"device": 0, "torch_dtype": torch.float16}
+    return {}
+
+def _quantized_pipeline(task: str, model_id: str):
+    """
+    Export model_id to ONNX, quantize it to dynamic int8 once (cached on disk under
+    ONNX_CACHE_DIR) and wrap it in a pipeline. Returns None if optimum is unavailable.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+    except ImportError:
+        logger.warning("LLM_ONNX_INT8 set but optimum[onnxruntime] is not installed; using the default model")
+        return None
+
+    save_dir = os.path.join(ONNX_CACHE_DIR, model_id.replace("/", "__"))
+    quantized_file = "model_quantized.onnx"
+    if not os.path.exists(os.path.join(save_dir, quantized_file)):
+        logger.info(f"Quantizing {model_id} to int8 ONNX (one-time)...")
+        ort_model = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+        ort_model.save_pretrained(save_dir)
+        AutoTokenizer.from_pretrained(model_id).save_pretrained(save_dir)
+        quantizer = ORTQuantizer.from_pretrained(ort_model)
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=save_dir, quantization_config=qconfig)
+
+    ort_model = ORTModelForSequenceClassification.from_pretrained(
+        save_dir, file_name=quantized_file, provider="CPUExecutionProvider")
+    return pipeline(task, model=ort_model, tokenizer=AutoTokenizer.from_pretrained(save_dir))
+
+def _load_pipeline(task: str, model_id: str):
+    """int8 ONNX pipeline when opted in and available, otherwise the regular HF pipeline."""
+    if USE_ONNX_INT8:
+        quantized = _quantized_pipeline(task, model_id)
+        if quantized is not None:
+            return quantized
+    return pipeline(task, model=model_id, **_pipeline_kwargs())
+
 def get_sentiment_pipeline():
     global sentiment_pipeline
     if sentiment_pipeline is None:
         logger.info("Loading sentiment analysis model...")
-        sentiment_pipeline = pipeline("sentiment-analysis", model="cardiffnlp/twitter-roberta-base-sentiment-latest")
+        sentiment_pipeline = _load_pipeline("sentiment-analysis", "cardiffnlp/twitter-roberta-base-sentiment-latest")
     return sentiment_pipeline
 
 def get_zero_shot_pipeline():
     global zero_shot_pipeline
     if zero_shot_pipeline is None:
         logger.info("Loading zero-shot classification model...")
-        zero_shot_pipeline = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+        zero_shot_pipeline = _load_pipeline("zero-shot-classification", "facebook/bart-large-mnli")
     return zero_shot_pipeline
 
-def analyze_news_item(news: Dict[str, Any]) -> Dict[str, Any]:
+def _keyword_entities(text: str) -> Dict[str, List[str]]:
+    """Simple entity extraction (keyword-based for now - can improve later)."""
+    entities = {"countries": [], "materials": []}
+    if "China" in text or "Chinese" in text:
+        entities["countries"].append("China")
+    if "Taiwan" in text:
+        entities["countries"].append("Taiwan")
+    text_lower = text.lower()
+    if "semiconductor" in text_lower:
+        entities["materials"].append("Semiconductors")
+    if "steel" in text_lower:
+        entities["materials"].append("Steel")
+    return entities
+
+def analyze_news_items(news_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    Use LLM to:
-    - Get sentiment score
-    - Classify risk type
-    - Extract potential affected entities (country/material)
+    Batched analyze_news_item: one sentiment and one zero-shot call for the whole list,
+    so tokenization and forward passes run over padded batches instead of item by item.
     """
-    title = news.get("title", "")
-    summary = news.get("summary", "")
-    text = title + " " + summary
-
-    result = {
+    texts = [news.get("title", "") + " " + news.get("summary", "") for news in news_list]
+    results = [{
         "original_relevance_score": news.get("relevance_score", 0.85),
         "llm_sentiment": "NEUTRAL",
         "llm_risk_types": [],
         "llm_confidence": 0.5,
         "affected_entities": {"countries": [], "materials": []}
-    }
+    } for news in news_list]
+    if not texts:
+        return results
 
     try:
-        # Sentiment
-        sent = get_sentiment_pipeline()(text[:512])[0]
-        result["llm_sentiment"] = sent["label"]
-        result["llm_confidence"] = sent["score"]
-
-        # Zero-shot risk classification
-        candidate_labels = ["high supply chain risk", "geopolitical risk", "natural disaster risk", "economic risk", "low risk"]
-        zs = get_zero_shot_pipeline()(text[:512], candidate_labels, multi_label=True)
-        top_risks = [label for label, score in zip(zs["labels"], zs["scores"]) if score > 0.4]
-        result["llm_risk_types"] = top_risks[:2]
-
-        # Simple entity extraction (keyword-based for now - can improve later)
-        if "China" in text or "Chinese" in text:
-            result["affected_entities"]["countries"].append("China")
-        if "Taiwan" in text:
-            result["affected_entities"]["countries"].append("Taiwan")
-        if "semiconductor" in text.lower():
-            result["affected_entities"]["materials"].append("Semiconductors")
-        if "steel" in text.lower():
-            result["affected_entities"]["materials"].append("Steel")
+        inputs = [text[:MAX_TEXT_CHARS] for text in texts]
+        grad_off = torch.inference_mode() if torch is not None else contextlib.nullcontext()
+        with grad_off:
+            # Sentiment
+            sents = get_sentiment_pipeline()(inputs, batch_size=SENTIMENT_BATCH_SIZE)
+            # Zero-shot risk classification
+            zss = get_zero_shot_pipeline()(inputs, RISK_LABELS, multi_label=True, batch_size=ZERO_SHOT_BATCH_SIZE)
+
+        for result, text, sent, zs in zip(results, texts, sents, zss):
+            result["llm_sentiment"] = sent["label"]
+            result["llm_confidence"] = sent["score"]
+            top_risks = [label for label, score in zip(zs["labels"], zs["scores"]) if score > 0.4]
+            result["llm_risk_types"] = top_risks[:2]
+            result["affected_entities"] = _keyword_entities(text)
 
     except Exception as e:
-        logger.warning(f"LLM analysis failed for news item: {e}")
-        result["llm_confidence"] = 0.0
+        logger.warning(f"LLM analysis failed for {len(texts)} news items: {e}")
+        for result in results:
+            result["llm_confidence"] = 0.0
+
+    return results
 
-    return result
\ No newline at end of file
+def analyze_news_item(news: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Use LLM to:
+    - Get sentiment score
+    - Classify risk type
+    - Extract potential affected entities (country/material)
+    """
+    return analyze_news_items([news])[0]
@@ -1,42 +1,75 @@
 """
 Shared memory system for agents.
 Stores intermediate results, graph state, detected risks, etc.
-Simple in-memory dict-based implementation (can be upgraded to Redis later).
+Slots-based container with one typed attribute per pipeline stage (can be upgraded to Redis later).
 """
 
+from dataclasses import dataclass, field, fields
 from typing import Any, Dict, Optional
 import logging
 
+import networkx as nx
+
 logger = logging.getLogger(__name__)
 
+
+@dataclass(slots=True)
 class AgentMemory:
-    """Central memory store shared across all agents."""
+    """
+    Central memory store shared across all agents.
+    Known pipeline keys are plain attributes; get()/set() remain for string-keyed callers,
+    and any other key falls back to a small dict. None means "not set".
+    """
 
-    def __init__(self):
-        self._store: Dict[str, Any] = {}
+    supply_chain_graph: Optional[nx.DiGraph] = None
+    supplier_index: Optional[Dict[str, Any]] = None
+    ingestion_result: Optional[Dict[str, Any]] = None
+    graph_result: Optional[Dict[str, Any]] = None
+    risk_result: Optional[Dict[str, Any]] = None
+    simulation_result: Optional[Dict[str, Any]] = None
+    decision_result: Optional[Dict[str, Any]] = None
+    _extra: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
         logger.info("AgentMemory initialized")
 
     def set(self, key: str, value: Any) -> None:
         """Store a value under a key."""
-        self._store[key] = value
-        logger.debug(f"Memory set: {key} (type: {type(value).__name__})")
+        if key in MEMORY_KEYS:
+            setattr(self, key, value)
+        else:
+            self._extra[key] = value
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Memory set: %s (type: %s)", key, type(value).__name__)
 
     def get(self, key: str, default: Any = None) -> Any:
         """Retrieve value by key, with optional default."""
-        value = self._store.get(key, default)
+        if key in MEMORY_KEYS:
+            value = getattr(self, key)
+            if value is None:
+                value = default
+        else:
+            value = self._extra.get(key, default)
         if value is None and default is None:
-            logger.warning(f"Memory miss for key: {key}")
+            logger.warning("Memory miss for key: %s", key)
         return value
 
     def clear(self) -> None:
         """Reset memory (useful between full cycles)."""
-        self._store.clear()
+        for key in MEMORY_KEYS:
+            setattr(self, key, None)
+        self._extra.clear()
         logger.info("Memory cleared")
 
     def dump(self) -> Dict[str, Any]:
         """Return full current state (for debugging/logging)."""
-        return dict(self._store)
+        state = {key: getattr(self, key) for key in MEMORY_KEYS if getattr(self, key) is not None}
+        state.update(self._extra)
+        return state
+
 
+# Attribute-backed keys, in pipeline order
+MEMORY_KEYS = tuple(f.name for f in fields(AgentMemory) if not f.name.startswith("_"))
 
 # Global singleton instance (simple for now)
-memory = AgentMemory()
\ No newline at end of file
+memory = AgentMemory()
@@ -1,8 +1,12 @@
 # core/news_fetcher.py
 import os
-import requests
+import importlib.util
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import List
+
+import httpx
 
 # Load .env automatically
 try:
@@ -15,17 +19,27 @@ logger = logging.getLogger(__name__)
 
 API_KEY = os.getenv("NEWSDATA_API_KEY")
 
-def fetch_recent_news(max_articles: int = 12) -> list:
+BASE_URL = "https://newsdata.io/api/1/latest"
+
+# SHORT query: must be ≤100 characters
+DEFAULT_QUERY = "supply chain OR disruption OR tariff OR China OR Taiwan"
+
+REQUEST_TIMEOUT = 15
+
+# One keep-alive connection pool for the process (HTTP/2 when the h2 extra is installed)
+_client = httpx.Client(
+    http2=importlib.util.find_spec("h2") is not None,
+    timeout=REQUEST_TIMEOUT,
+    limits=httpx.Limits(max_keepalive_connections=10),
+)
+
+
+def fetch_recent_news(max_articles: int = 12, query: str = DEFAULT_QUERY) -> list:
     """Fetch recent news from NewsData.io with short, valid query."""
     if not API_KEY:
         logger.error("NEWSDATA_API_KEY not set! Add to .env or environment variables.")
         return []
 
-    base_url = "https://newsdata.io/api/1/latest"
-
-    # SHORT query: must be ≤100 characters
-    query = "supply chain OR disruption OR tariff OR China OR Taiwan"
-
     params = {
         "apikey": API_KEY,
         "q": query,
@@ -34,14 +48,14 @@ def fetch_recent_news(max_articles: int = 12) -> list:
     }
 
     try:
-        response = requests.get(base_url, params=params, timeout=15)
+        response = _client.get(BASE_URL, params=params)
         response.raise_for_status()
 
         data = response.json()
 
         if data.get("status") != "success":
-            logger.error(f"NewsData.io error: {data.get('message', 'Unknown')}")
-            logger.debug(f"Full API response: {data}")
+            logger.error("NewsData.io error: %s", data.get("message", "Unknown"))
+            logger.debug("Full API response: %s", data)
             return []
 
         articles = data.get("results", [])[:max_articles]
@@ -57,12 +71,38 @@ def fetch_recent_news(max_articles: int = 12) -> list:
                 "relevance_score": 0.85
             })
 
-        logger.info(f"Collected {len(formatted)} real news items from NewsData.io")
+        logger.info("Collected %s real news items from NewsData.io", len(formatted))
         return formatted
 
-    except requests.exceptions.HTTPError as e:
-        logger.error(f"HTTP {e.response.status_code}: {e.response.text}")
+    except httpx.HTTPStatusError as e:
+        logger.error("HTTP %s: %s", e.response.status_code, e.response.text)
         return []
     except Exception as e:
-        logger.error(f"NewsData.io fetch failed: {str(e)}")
-        return []
\ No newline at end of file
+        logger.error("NewsData.io fetch failed: %s", e)
+        return []
+
+
+def fetch_recent_news_many(queries: List[str], max_articles: int = 12) -> list:
+    """
+    Run several NewsData.io queries concurrently over the shared connection pool
+    (network-bound, so threads overlap the waits).
+    Returns the merged articles in query order, de-duplicated by URL.
+    """
+    # A repeated query would only return articles already merged, so each is fetched once
+    queries = list(dict.fromkeys(queries))
+    if not queries:
+        return []
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        batches = list(executor.map(lambda q: fetch_recent_news(max_articles, q), queries))
+
+    merged = []
+    seen_urls = set()
+    for batch in batches:
+        for article in batch:
+            url = article.get("url")
+            if url and url in seen_urls:
+                continue
+            seen_urls.add(url)
+            merged.append(article)
+    return merged
@@ -78,7 +78,10 @@ class Orchestrator:
 
             # Save cycle to history
             save_result = persistence.save_cycle(memory.dump())
-            if save_result["status"] == "success":
+            save_status = save_result["status"]
+            if save_status == "pending":  # written in the background
+                logger.info(f"Cycle queued for saving: {save_result['filename']}")
+            elif save_status != "error":
                 logger.info(f"Cycle persisted: {save_result['filename']}")
             else:
                 logger.warning(f"Failed to persist cycle: {save_result.get('error')}")
@@ -86,7 +89,9 @@ class Orchestrator:
             return {
                 "status": "success",
                 "cycle_duration_seconds": duration,
-                "persisted": save_result["status"] == "success",
+                # None while a background save is still pending (see save_status)
+                "persisted": None if save_status == "pending" else save_status != "error",
+                "save_status": save_status,
                 "persistence_filename": save_result.get("filename"),
                 "summary": {
                     "suppliers": ingest_result.get("suppliers_count", 0),
@@ -0,0 +1,73 @@
+# core/supplier_index.py
+"""
+Supplier Index - Match strings for every supplier node of the supply chain graph
+Built once per graph by GraphAgent and shared through memory as "supplier_index"
+"""
+
+from typing import Dict, Any, List
+import sys
+
+import networkx as nx
+
+try:
+    import ahocorasick  # pyahocorasick, optional
+except ImportError:
+    ahocorasick = None
+
+
+def _supplier_needles(data: Dict) -> set:
+    """Lowercased (interned) strings whose presence in news text marks a supplier as affected."""
+    country = data.get("country", "").lower()
+    material = data.get("material", "").lower()
+    name = data.get("name", "").lower()
+    needles = {country, country + "ese",  # e.g. "Chinese"
+               material, material.replace(" ", ""), name}  # e.g. "semi conductor" → "semiconductor"
+    needles.update(material.split()[:1])
+    needles.update(name.split())
+    # A needle containing another of the same supplier's needles can never decide a match
+    # ("acme corp" vs "acme", "chinaese" vs "china"), so only the minimal ones are kept.
+    return {sys.intern(needle) for needle in needles
+            if not any(other != needle and other in needle for other in needles)}
+
+
+def build_supplier_index(G: nx.DiGraph) -> Dict[str, Any]:
+    """
+    Index supplier nodes by their match strings once per graph, so each news item is
+    scanned against the distinct needles instead of looping every supplier.
+    Uses an Aho-Corasick automaton when pyahocorasick is installed.
+    """
+    suppliers = [(node, data) for node, data in G.nodes(data=True) if data.get("type") == "supplier"]
+    needle_positions: Dict[str, List[int]] = {}
+    for pos, (_, data) in enumerate(suppliers):
+        for needle in _supplier_needles(data):
+            needle_positions.setdefault(needle, []).append(pos)
+
+    automaton = None
+    if ahocorasick is not None and any(needle_positions):
+        automaton = ahocorasick.Automaton()
+        for needle, positions in needle_positions.items():
+            if needle:  # empty needle matches everything; handled via "always"
+                automaton.add_word(needle, positions)
+        automaton.make_automaton()
+
+    return {
+        "graph": G,
+        "suppliers": suppliers,
+        # Per-supplier attributes, aligned with `suppliers`
+        "countries": [sys.intern(data.get("country", "").strip()) for _, data in suppliers],
+        "materials": [data.get("material", "") for _, data in suppliers],
+        "needles": needle_positions,
+        "always": needle_positions.get("", []),
+        "automaton": automaton,
+    }
+
+
+def match_suppliers(index: Dict[str, Any], text: str) -> List[int]:
+    """Positions (in graph order) of suppliers with any needle occurring in lowercased text."""
+    if index["automaton"] is not None:
+        hits = set(index["always"])
+        for _, positions in index["automaton"].iter(text):
+            hits.update(positions)
+    else:
+        hits = {pos for needle, positions in index["needles"].items() if needle in text for pos in positions}
+    return sorted(hits)
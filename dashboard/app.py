@@ -1,4 +1,6 @@
 # dashboard/app.py
+from operator import itemgetter
+
 import streamlit as st
 from streamlit_extras.app_logo import add_logo
 from core.memory import memory
@@ -10,7 +12,8 @@ from dashboard.visualizations import (
     build_scenario_comparison,
 )
 from dashboard.history_utils import (
-    get_history_list,
+    get_history_listing,
+    get_history_stats,
     load_and_display_cycle,
     get_history_comparison_data,
     display_history_stats,
@@ -36,6 +39,63 @@ if st.sidebar.button("Run New Analysis", type="primary"):
 st.sidebar.markdown("---")
 st.sidebar.info("Last analysis: " + (memory.get("decision_result") or {}).get("decision_timestamp", "Never"))
 
+def render_action_card(action: str, urgency: int, confidence: float, lead_time: int, description: str) -> str:
+    """HTML card for one recommended action."""
+    color = "#ff4d4d" if urgency >= 4 else "#ffa726" if urgency >= 3 else "#4caf50"
+    
+    # Ensure confidence is capped at 1.0
+    confidence = min(max(confidence, 0), 1.0)
+    
+    action_name = action.replace('_', ' ').title()
+    lead_time_text = f" | Lead Time: {lead_time}d" if lead_time > 0 else ""
+    
+    return f"""
+                        <div style="
+                            padding: 12px;
+                            margin: 10px 0;
+                            border-left: 6px solid {color};
+                            background-color: #f0f2f6;
+                            border-radius: 6px;
+                            color: #111111 !important;
+                            font-size: 15px;
+                            line-height: 1.45;
+                        ">
+                            <strong>{action_name}</strong><br>
+                            <span style="color: #555;">Urgency: {urgency}/5 | Confidence: {confidence:.0%}{lead_time_text}</span><br>
+                            <small>{description}</small>
+                        </div>
+                        """
+
+
+def risk_expander_title(node_id: str, name: str, severity: float) -> str:
+    """Expander title for a detected risk, colored by severity."""
+    severity_color = "🔴" if severity >= 0.9 else "🟠" if severity >= 0.6 else "🟡"
+    return f"{severity_color} {node_id} - {name} (Severity: {severity:.2f})"
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def render_risk_panels(cycle_key: tuple, _risks: list, _decision_map: dict) -> list:
+    """
+    (expander title, action card HTML list) for each listed risk, rendered once per
+    analysis cycle: cycle_key identifies the cycle, the data itself is not hashed.
+    """
+    panels = []
+    for risk in _risks:
+        decision = _decision_map.get(risk["node_id"], {})
+        cards = [
+            render_action_card(
+                act["action"],
+                act["urgency"],
+                act.get("estimated_confidence", 0.0),
+                act.get("lead_time_days", 0),
+                act["description"],
+            )
+            for act in decision.get("recommended_actions") or []
+        ]
+        panels.append((risk_expander_title(risk["node_id"], risk["name"], risk["risk_score"]), cards))
+    return panels
+
+
 # Main tabs
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["Overview", "Supply Chain Graph", "Risks & Decisions", "Advanced Visuals", "History"])
 
@@ -75,13 +135,14 @@ with tab3:
     decision_map = {d["node_id"]: d for d in decisions}
 
     # Sort risks by severity DESCENDING
-    sorted_risks = sorted(risks, key=lambda r: r["risk_score"], reverse=True)
+    sorted_risks = sorted(risks, key=itemgetter("risk_score"), reverse=True)
 
     # Top 3 Actions Today card
     all_actions = []
     for decision in decisions:
         for act in decision.get("recommended_actions", []):
             act_copy = act.copy()
+            act_copy.setdefault("estimated_confidence", 0)
             act_copy["node_id"] = decision["node_id"]
             act_copy["node_name"] = decision.get("name", decision["node_id"])
             act_copy["material"] = decision.get("material", "Unknown")
@@ -94,7 +155,7 @@ with tab3:
     # Sort all actions by urgency DESC, then by confidence
     top_actions = sorted(
         all_actions,
-        key=lambda a: (a["urgency"], a.get("estimated_confidence", 0)),
+        key=itemgetter("urgency", "estimated_confidence"),
         reverse=True
     )[:3]
 
@@ -125,14 +186,17 @@ with tab3:
     st.markdown("---")
 
     # Risks list – sorted by severity
-    for risk in sorted_risks[:8]:
+    listed_risks = sorted_risks[:8]
+    cycle_key = (memory.get("risk_result", {}).get("analysis_timestamp"),
+                 memory.get("decision_result", {}).get("decision_timestamp"))
+    panels = render_risk_panels(cycle_key, listed_risks, decision_map)
+    for risk, (title, cards) in zip(listed_risks, panels):
         node_id = risk["node_id"]
         decision = decision_map.get(node_id, {})
 
         severity = risk["risk_score"]
-        severity_color = "🔴" if severity >= 0.9 else "🟠" if severity >= 0.6 else "🟡"
 
-        with st.expander(f"{severity_color} {node_id} - {risk['name']} (Severity: {severity:.2f})"):
+        with st.expander(title):
             # Risk summary
             col1, col2, col3 = st.columns(3)
             col1.metric("Risk Score", f"{severity:.2f}/1.0")
@@ -149,38 +213,9 @@ with tab3:
                 sim_col3.metric("Affected Nodes", decision.get("affected_nodes_count", 0))
             
             st.markdown("**Recommended Actions:**")
-            if decision and decision.get("recommended_actions"):
-                for act in decision["recommended_actions"]:
-                    urgency = act["urgency"]
-                    color = "#ff4d4d" if urgency >= 4 else "#ffa726" if urgency >= 3 else "#4caf50"
-                    confidence = act.get("estimated_confidence", 0.0)
-                    lead_time = act.get("lead_time_days", 0)
-                    
-                    # Ensure confidence is capped at 1.0
-                    confidence = min(max(confidence, 0), 1.0)
-                    
-                    action_name = act['action'].replace('_', ' ').title()
-                    lead_time_text = f" | Lead Time: {lead_time}d" if lead_time > 0 else ""
-                    
-                    st.markdown(
-                        f"""
-                        <div style="
-                            padding: 12px;
-                            margin: 10px 0;
-                            border-left: 6px solid {color};
-                            background-color: #f0f2f6;
-                            border-radius: 6px;
-                            color: #111111 !important;
-                            font-size: 15px;
-                            line-height: 1.45;
-                        ">
-                            <strong>{action_name}</strong><br>
-                            <span style="color: #555;">Urgency: {urgency}/5 | Confidence: {confidence:.0%}{lead_time_text}</span><br>
-                            <small>{act['description']}</small>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
+            if cards:
+                for card in cards:
+                    st.markdown(card, unsafe_allow_html=True)
             else:
                 st.warning("No decision recommendations generated for this risk yet.")
 
@@ -258,20 +293,17 @@ with tab5:
     # History browser
     st.markdown("### Browse Past Cycles")
     
-    history = get_history_list()
+    history, cycle_options = get_history_listing()
     
     if not history:
         st.info("No analysis cycles saved yet. Run 'Run New Analysis' to create one.")
     else:
         # Create list of cycles for selection
-        cycle_options = {
-            f"{entry['timestamp'][:19]} | {entry['file_size_bytes']:,} bytes": entry['filename']
-            for entry in history
-        }
+        option_labels = list(cycle_options)
         
         selected_display = st.selectbox(
             "Select a cycle to view:",
-            options=list(cycle_options.keys()),
+            options=option_labels,
             index=0
         )
         
@@ -289,6 +321,8 @@ with tab5:
                 if st.button("Delete This Cycle", key=f"delete_{selected_filename}"):
                     result = persistence.delete_cycle(selected_filename)
                     if result["status"] == "success":
+                        get_history_listing.clear()
+                        get_history_stats.clear()
                         st.success("Cycle deleted!")
                         st.rerun()
                     else:
@@ -326,7 +360,7 @@ with tab5:
             with col1:
                 cycle1_display = st.selectbox(
                     "First cycle:",
-                    options=list(cycle_options.keys()),
+                    options=option_labels,
                     index=0,
                     key="compare_1"
                 )
@@ -335,7 +369,7 @@ with tab5:
             with col2:
                 cycle2_display = st.selectbox(
                     "Second cycle:",
-                    options=list(cycle_options.keys()),
+                    options=option_labels,
                     index=1 if len(history) > 1 else 0,
                     key="compare_2"
                 )
@@ -363,8 +397,8 @@ with tab5:
                     
                     # Risk comparison
                     st.markdown("#### Risk Changes")
-                    risks1 = set(r.get("node_id") for r in comparison["cycle1"].get("risk_result", {}).get("risks_detected", []))
-                    risks2 = set(r.get("node_id") for r in comparison["cycle2"].get("risk_result", {}).get("risks_detected", []))
+                    risks1 = {r.get("node_id") for r in comparison["cycle1"].get("risk_result", {}).get("risks_detected", [])}
+                    risks2 = {r.get("node_id") for r in comparison["cycle2"].get("risk_result", {}).get("risks_detected", [])}
                     
                     new_risks = risks2 - risks1
                     resolved_risks = risks1 - risks2
@@ -3,19 +3,146 @@
 History utilities for browsing and viewing past analysis cycles
 """
 
+import pandas as pd
 import streamlit as st
 from core.persistence import persistence
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
+# Columns shown per history tab, in display order (missing ones are skipped)
+RISK_DISPLAY_COLS = pd.Index(["node_id", "name", "country", "material", "risk_score", "news_title"])
+SCENARIO_DISPLAY_COLS = pd.Index(["node_id", "estimated_delay_days", "service_level_impact_pct",
+                                  "disruption_type", "affected_nodes_count", "severity_used"])
+NEWS_DISPLAY_COLS = pd.Index(["title", "source", "published", "relevance_score"])
 
-def get_history_list():
-    """Get list of all saved analysis cycles."""
-    return persistence.list_history(limit=100)
+
+def _cycle_options(history: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Selectbox label → cycle filename. Labels carry the full timestamp parsed from
+    the filename, not a truncated one, so cycles saved within a second stay distinct.
+    """
+    # Risk counts come from the cycle's summary header (no full load needed)
+    return {
+        f"{entry['timestamp']} | "
+        + (f"{entry['summary']['risks_detected']} risks | " if entry.get("summary") else "")
+        + f"{entry['file_size_bytes']:,} bytes": entry['filename']
+        for entry in history
+    }
+
+
+@st.cache_data(ttl=10)
+def get_history_listing() -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Saved analysis cycles and their selectbox options (label → filename), cached
+    together briefly across Streamlit reruns so the two never disagree.
+    """
+    history = persistence.list_history(limit=100)
+    return history, _cycle_options(history)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_load_cycle(filename: str, mtime: Optional[float]) -> Dict[str, Any]:
+    return persistence.load_cycle(filename)
+
+
+def load_cycle_cached(filename: str) -> Dict[str, Any]:
+    """Load a cycle, reusing the parsed result until its file changes or is deleted."""
+    return _cached_load_cycle(filename, persistence.get_cycle_mtime(filename))
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_history_stats() -> Dict[str, Any]:
+    """History statistics (cached across Streamlit reruns)."""
+    return persistence.get_summary_stats()
+
+
+def _cycle_data(filename: str, mtime: Optional[float]) -> Dict[str, Any]:
+    result = _cached_load_cycle(filename, mtime)
+    return result["data"] if result["status"] == "success" else {}
+
+
+# Per-tab tables are built once per cycle file and reused across reruns; the CSV
+# for each download button is cached the same way rather than re-serialized
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_risks_df(filename: str, mtime: Optional[float]) -> pd.DataFrame:
+    return pd.DataFrame(_cycle_data(filename, mtime).get("risk_result", {}).get("risks_detected", []))
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_scenarios_df(filename: str, mtime: Optional[float]) -> pd.DataFrame:
+    return pd.DataFrame(_cycle_data(filename, mtime).get("simulation_result", {}).get("scenarios", []))
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_decisions_df(filename: str, mtime: Optional[float]) -> pd.DataFrame:
+    decisions = _cycle_data(filename, mtime).get("decision_result", {}).get("recommended_actions", [])
+    
+    # Flatten the nested structure for display, one list per column
+    node_ids, node_names, actions, urgencies, confidences, lead_times = [], [], [], [], [], []
+    for decision in decisions:
+        node_id = decision.get("node_id", "Unknown")
+        node_name = decision.get("name", "Unknown")
+        for action in decision.get("recommended_actions", []):
+            node_ids.append(node_id)
+            node_names.append(node_name)
+            actions.append(action.get("action", ""))
+            urgencies.append(action.get("urgency", ""))
+            confidences.append(action.get("estimated_confidence", 0))
+            lead_times.append(action.get("lead_time_days", 0))
+    return pd.DataFrame({
+        "node_id": node_ids,
+        "node_name": node_names,
+        "action": actions,
+        "urgency": urgencies,
+        "confidence": confidences,
+        "lead_time_days": lead_times,
+    })
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_news_df(filename: str, mtime: Optional[float]) -> pd.DataFrame:
+    return pd.DataFrame(_cycle_data(filename, mtime).get("ingestion_result", {}).get("news_items", []))
+
+
+_TABLE_BUILDERS = {
+    "risks": _build_risks_df,
+    "scenarios": _build_scenarios_df,
+    "decisions": _build_decisions_df,
+    "news": _build_news_df,
+}
+
+
+# Columns shown per table (None: all of them)
+_TABLE_DISPLAY_COLS = {
+    "risks": RISK_DISPLAY_COLS,
+    "scenarios": SCENARIO_DISPLAY_COLS,
+    "decisions": None,
+    "news": NEWS_DISPLAY_COLS,
+}
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _display_frame(filename: str, mtime: Optional[float], table: str) -> pd.DataFrame:
+    """
+    The frame a tab shows, selected once per cycle file. Held as a shared resource rather
+    than cache_data, so reruns get the same object instead of an unpickled copy
+    (read-only: st.dataframe does not modify it).
+    """
+    df = _TABLE_BUILDERS[table](filename, mtime)
+    display_cols = _TABLE_DISPLAY_COLS[table]
+    if display_cols is not None:
+        df = df.loc[:, display_cols.intersection(df.columns, sort=False)]
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _table_csv(filename: str, mtime: Optional[float], table: str) -> bytes:
+    return _TABLE_BUILDERS[table](filename, mtime).to_csv(index=False).encode("utf-8")
 
 
 def load_and_display_cycle(filename: str):
     """Load and display a cycle's detailed results."""
-    result = persistence.load_cycle(filename)
+    mtime = persistence.get_cycle_mtime(filename)
+    result = _cached_load_cycle(filename, mtime)
     
     if result["status"] != "success":
         st.error(f"Failed to load cycle: {result.get('error')}")
@@ -38,25 +165,24 @@ def load_and_display_cycle(filename: str):
     
     st.markdown("---")
     
+    # Nothing to tabulate: skip the tabs and their tables entirely
+    if not any((summary["risks_detected"], summary["scenarios"], summary["decisions"], summary["news_items"])):
+        st.info("No results in this cycle")
+        return True
+    
     # Tabbed view of results
     tab1, tab2, tab3, tab4 = st.tabs(["Risks", "Simulations", "Decisions", "News"])
     
     with tab1:
         st.subheader("Detected Risks")
-        risks = data.get("risk_result", {}).get("risks_detected", [])
-        if risks:
-            import pandas as pd
-            risks_df = pd.DataFrame(risks)
-            # Select important columns for display
-            display_cols = [col for col in ["node_id", "name", "country", "material", "risk_score", "news_title"] 
-                          if col in risks_df.columns]
-            st.dataframe(risks_df[display_cols], use_container_width=True)
+        risks_df = _display_frame(filename, mtime, "risks")
+        if not risks_df.empty:
+            st.dataframe(risks_df, use_container_width=True)
             
             # Download button
-            csv = risks_df.to_csv(index=False)
             st.download_button(
                 label="Download Risks as CSV",
-                data=csv,
+                data=_table_csv(filename, mtime, "risks"),
                 file_name=f"{filename}_risks.csv",
                 mime="text/csv"
             )
@@ -65,21 +191,14 @@ def load_and_display_cycle(filename: str):
     
     with tab2:
         st.subheader("Simulation Scenarios")
-        scenarios = data.get("simulation_result", {}).get("scenarios", [])
-        if scenarios:
-            import pandas as pd
-            scenarios_df = pd.DataFrame(scenarios)
-            # Select important columns
-            display_cols = [col for col in ["node_id", "estimated_delay_days", "service_level_impact_pct", 
-                                           "disruption_type", "affected_nodes_count", "severity_used"]
-                          if col in scenarios_df.columns]
-            st.dataframe(scenarios_df[display_cols], use_container_width=True)
+        scenarios_df = _display_frame(filename, mtime, "scenarios")
+        if not scenarios_df.empty:
+            st.dataframe(scenarios_df, use_container_width=True)
             
             # Download button
-            csv = scenarios_df.to_csv(index=False)
             st.download_button(
                 label="Download Scenarios as CSV",
-                data=csv,
+                data=_table_csv(filename, mtime, "scenarios"),
                 file_name=f"{filename}_scenarios.csv",
                 mime="text/csv"
             )
@@ -88,34 +207,16 @@ def load_and_display_cycle(filename: str):
     
     with tab3:
         st.subheader("Recommended Actions")
-        decisions = data.get("decision_result", {}).get("recommended_actions", [])
-        if decisions:
-            import pandas as pd
-            
-            # Flatten the nested structure for display
-            flat_decisions = []
-            for decision in decisions:
-                node_id = decision.get("node_id", "Unknown")
-                node_name = decision.get("name", "Unknown")
-                for action in decision.get("recommended_actions", []):
-                    flat_decisions.append({
-                        "node_id": node_id,
-                        "node_name": node_name,
-                        "action": action.get("action", ""),
-                        "urgency": action.get("urgency", ""),
-                        "confidence": action.get("estimated_confidence", 0),
-                        "lead_time_days": action.get("lead_time_days", 0),
-                    })
+        if data.get("decision_result", {}).get("recommended_actions", []):
+            decisions_df = _display_frame(filename, mtime, "decisions")
             
-            if flat_decisions:
-                decisions_df = pd.DataFrame(flat_decisions)
+            if not decisions_df.empty:
                 st.dataframe(decisions_df, use_container_width=True)
                 
                 # Download button
-                csv = decisions_df.to_csv(index=False)
                 st.download_button(
                     label="Download Decisions as CSV",
-                    data=csv,
+                    data=_table_csv(filename, mtime, "decisions"),
                     file_name=f"{filename}_decisions.csv",
                     mime="text/csv"
                 )
@@ -126,13 +227,9 @@ def load_and_display_cycle(filename: str):
     
     with tab4:
         st.subheader("News Items Used")
-        news = data.get("ingestion_result", {}).get("news_items", [])
-        if news:
-            import pandas as pd
-            news_df = pd.DataFrame(news)
-            display_cols = [col for col in ["title", "source", "published", "relevance_score"]
-                          if col in news_df.columns]
-            st.dataframe(news_df[display_cols], use_container_width=True)
+        news_df = _display_frame(filename, mtime, "news")
+        if not news_df.empty:
+            st.dataframe(news_df, use_container_width=True)
         else:
             st.info("No news items in this cycle")
     
@@ -152,8 +249,8 @@ def load_and_display_cycle(filename: str):
 
 def get_history_comparison_data(filename1: str, filename2: str) -> Optional[Dict[str, Any]]:
     """Get data to compare two analysis cycles."""
-    result1 = persistence.load_cycle(filename1)
-    result2 = persistence.load_cycle(filename2)
+    result1 = load_cycle_cached(filename1)
+    result2 = load_cycle_cached(filename2)
     
     if result1["status"] != "success" or result2["status"] != "success":
         return None
@@ -168,14 +265,18 @@ def get_history_comparison_data(filename1: str, filename2: str) -> Optional[Dict
 
 def display_history_stats():
     """Display overall history statistics."""
-    stats = persistence.get_summary_stats()
+    stats = get_history_stats()
     
     if "error" in stats:
         st.error(f"Failed to get statistics: {stats['error']}")
         return
     
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total Cycles", stats.get("total_cycles", 0))
-    col2.metric("Total Storage", f"{stats.get('total_storage_mb', 0):.1f} MB")
-    col3.metric("Avg Size", f"{stats.get('average_size_kb', 0):.1f} KB")
-    col4.metric("Date Range", f"{stats.get('newest_cycle', 'N/A')[:10] if stats.get('newest_cycle') else 'N/A'}")
+    newest = stats.get("newest_cycle")
+    metrics = [
+        ("Total Cycles", stats.get("total_cycles", 0)),
+        ("Total Storage", f"{stats.get('total_storage_mb', 0):.1f} MB"),
+        ("Avg Size", f"{stats.get('average_size_kb', 0):.1f} KB"),
+        ("Date Range", newest[:10] if newest else "N/A"),
+    ]
+    for col, (label, value) in zip(st.columns(len(metrics)), metrics):
+        col.metric(label, value)
@@ -1,8 +1,8 @@
 # dashboard/utils.py
 import streamlit as st
 import networkx as nx
+from concurrent.futures import ThreadPoolExecutor
 from pyvis.network import Network
-import os
 from core.memory import memory
 from agents.ingestion_agent import IngestionAgent
 from agents.graph_agent import GraphAgent
@@ -10,14 +10,31 @@ from agents.risk_agent import RiskAgent
 from agents.simulation_agent import SimulationAgent
 from agents.decision_agent import DecisionAgent
 
+# PyVis node colors by node type
+NODE_COLORS = {
+    "supplier": "#4CAF50",
+    "factory": "#2196F3",
+    "warehouse": "#FF9800",
+    "customer": "#9C27B0",
+}
+
+# Rendered graph HTML by graph shape; cleared whenever a new analysis rebuilds the graph
+_GRAPH_HTML_CACHE: dict[tuple, str] = {}
+
 def run_full_analysis():
     """Trigger complete analysis cycle and store results in memory"""
     with st.spinner("Running full analysis cycle..."):
         ing = IngestionAgent()
-        ingest = ing.run()
-
         graph_agent = GraphAgent()
-        graph_agent.run(ingest["suppliers"])
+
+        # The graph only depends on suppliers, so it is built while the news is fetched;
+        # loading suppliers first warms the agent's cache, so ing.run() reuses the same list
+        suppliers = ing.load_suppliers()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            ingest_future = pool.submit(ing.run)
+            graph_agent.run(suppliers)
+            _GRAPH_HTML_CACHE.clear()
+            ingest = ingest_future.result()
 
         risk = RiskAgent()
         risk.run(ingest["news_items"], memory.get("graph_result"))
@@ -37,6 +54,11 @@ def get_interactive_graph_html():
     if G is None or G.number_of_nodes() == 0:
         return "<p>No graph available. Run analysis first.</p>"
 
+    key = (G.number_of_nodes(), G.number_of_edges(), hash(frozenset(G.nodes())))
+    cached = _GRAPH_HTML_CACHE.get(key)
+    if cached is not None:
+        return cached
+
     net = Network(
         height="550px",
         width="100%",
@@ -51,21 +73,10 @@ def get_interactive_graph_html():
     # Customize a bit
     for node in net.nodes:
         node["title"] = f"{node.get('name', node['id'])}\nType: {node.get('type', '?')}"
-        if node.get("type") == "supplier":
-            node["color"] = "#4CAF50"
-        elif node.get("type") == "factory":
-            node["color"] = "#2196F3"
-        elif node.get("type") == "warehouse":
-            node["color"] = "#FF9800"
-        elif node.get("type") == "customer":
-            node["color"] = "#9C27B0"
-
-    # Save to temp file
-    html_path = "temp_graph.html"
-    net.save_graph(html_path)
-
-    with open(html_path, "r", encoding="utf-8") as f:
-        html_content = f.read()
+        color = NODE_COLORS.get(node.get("type"))
+        if color is not None:
+            node["color"] = color
 
-    os.remove(html_path)  # cleanup
+    # Render straight to a string (no temp file shared between sessions)
+    html_content = _GRAPH_HTML_CACHE[key] = net.generate_html(notebook=False)
     return html_content
\ No newline at end of file
@@ -6,7 +6,7 @@ Uses Plotly for responsive, theme-aware charts.
 
 import logging
 from typing import Dict, List, Any, Optional
-from datetime import datetime
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
@@ -55,8 +55,9 @@ def build_supplier_bubble_chart(risk_result: Dict[str, Any],
     # Create scenario lookup: node_id → scenario data
     scenario_map = {s["node_id"]: s for s in scenarios}
     
-    # Prepare bubble chart data
-    bubble_data = []
+    # Prepare bubble chart data, one list per column
+    names, countries, materials, risk_scores = [], [], [], []
+    delays, impacts, news_titles_short = [], [], []
     for risk in risks:
         node_id = risk["node_id"]
         scenario = scenario_map.get(node_id)
@@ -64,30 +65,47 @@ def build_supplier_bubble_chart(risk_result: Dict[str, Any],
         if not scenario:
             continue
         
-        bubble_data.append({
-            "supplier_name": risk["name"],
-            "country": risk.get("country", "Unknown"),
-            "material": risk.get("material", "Unknown"),
-            "risk_score": risk["risk_score"],
-            "estimated_delay_days": scenario["estimated_delay_days"],
-            "service_level_impact": scenario["service_level_impact_pct"],
-            "news_title": risk.get("news_title", "Unknown"),
-        })
-    
-    if not bubble_data:
+        names.append(risk["name"])
+        countries.append(risk.get("country", "Unknown"))
+        materials.append(risk.get("material", "Unknown"))
+        risk_scores.append(risk["risk_score"])
+        delays.append(scenario["estimated_delay_days"])
+        impacts.append(scenario["service_level_impact_pct"])
+        news_titles_short.append(str(risk.get("news_title", "Unknown"))[:60])  # hover preview
+    
+    if not names:
         return None
     
-    df = pd.DataFrame(bubble_data)
-    
-    # Map countries to colors
+    df = pd.DataFrame({
+        "supplier_name": names,
+        "country": countries,
+        "material": materials,
+        "risk_score": risk_scores,
+        "estimated_delay_days": delays,
+        "service_level_impact": impacts,
+        "news_title_short": news_titles_short,
+    })
+    
+    # Map countries to colors and scale bubble sizes (once, not per country trace)
     df["color"] = df["country"].map(COUNTRY_COLORS).fillna("#636EFA")
+    df["_marker_size"] = df["risk_score"].to_numpy() * 50
+    
+    # Hover text for all suppliers at once (column-wise string ops, no per-row iteration)
+    df["hover"] = (
+        "<b>" + df["supplier_name"].astype(str) + "</b><br>"
+        + "Country: " + df["country"].astype(str) + "<br>"
+        + "Material: " + df["material"].astype(str) + "<br>"
+        + "Risk Score: " + df["risk_score"].map("{:.2f}".format) + "<br>"
+        + "Delay: " + df["estimated_delay_days"].map("{:.1f}".format) + " days<br>"
+        + "Impact: " + df["service_level_impact"].map("{:.1f}".format) + "%<br>"
+        + "News: " + df["news_title_short"] + "..."
+    )
     
     # Create bubble chart
     fig = go.Figure()
     
-    # Group by country for legend
-    for country in df["country"].unique():
-        country_data = df[df["country"] == country]
+    # Group by country for legend (one partitioning pass, first-seen order)
+    for country, country_data in df.groupby("country", sort=False):
         color = COUNTRY_COLORS.get(country, "#636EFA")
         
         fig.add_trace(go.Scatter(
@@ -96,21 +114,12 @@ def build_supplier_bubble_chart(risk_result: Dict[str, Any],
             mode="markers",
             name=country,
             marker=dict(
-                size=country_data["risk_score"] * 50,  # Scale bubble size
+                size=country_data["_marker_size"].to_numpy(),
                 color=color,
                 opacity=0.7,
                 line=dict(width=2, color="white"),
             ),
-            text=[
-                f"<b>{row['supplier_name']}</b><br>" +
-                f"Country: {row['country']}<br>" +
-                f"Material: {row['material']}<br>" +
-                f"Risk Score: {row['risk_score']:.2f}<br>" +
-                f"Delay: {row['estimated_delay_days']:.1f} days<br>" +
-                f"Impact: {row['service_level_impact']:.1f}%<br>" +
-                f"News: {row['news_title'][:60]}..."
-                for _, row in country_data.iterrows()
-            ],
+            text=country_data["hover"].tolist(),
             hovertemplate="<extra></extra>%{text}",
         ))
     
@@ -145,44 +154,39 @@ def build_news_timeline(ingestion_result: Dict[str, Any]) -> Optional[go.Figure]
     if not news_items:
         return None
     
-    # Prepare timeline data
-    timeline_data = []
+    # Prepare timeline data, one list per column
+    published, titles, sources, summaries, urls, relevances = [], [], [], [], [], []
     for item in news_items:
-        # Parse published timestamp
-        try:
-            pub_date = pd.to_datetime(item.get("published", datetime.now().isoformat()))
-        except:
-            pub_date = datetime.now()
-        
-        relevance = item.get("relevance_score", 0.5)
-        
-        # Map relevance to color
-        if relevance >= 0.75:
-            color = RELEVANCE_COLORS["high"]
-            relevance_label = "High"
-        elif relevance >= 0.5:
-            color = RELEVANCE_COLORS["medium"]
-            relevance_label = "Medium"
-        else:
-            color = RELEVANCE_COLORS["low"]
-            relevance_label = "Low"
-        
-        timeline_data.append({
-            "published": pub_date,
-            "title": item.get("title", "Unknown"),
-            "source": item.get("source", "Unknown"),
-            "summary": item.get("summary", ""),
-            "url": item.get("url", ""),
-            "relevance_score": relevance,
-            "color": color,
-            "relevance_label": relevance_label,
-        })
-    
-    if not timeline_data:
-        return None
-    
-    df = pd.DataFrame(timeline_data)
+        published.append(item.get("published"))
+        titles.append(item.get("title", "Unknown"))
+        sources.append(item.get("source", "Unknown"))
+        summaries.append(item.get("summary", ""))
+        urls.append(item.get("url", ""))
+        relevances.append(item.get("relevance_score", 0.5))
+    
+    # Parse all timestamps in one call; feeds mix naive and UTC-offset strings, so
+    # everything is read as UTC and shown as naive wall time, unparseable → now
+    pub_dates = pd.to_datetime(pd.Series(published, dtype=object), errors="coerce", format="mixed", utc=True)
+    pub_dates = pub_dates.dt.tz_localize(None).fillna(pd.Timestamp.now())
+    
+    # Map relevance to color
+    relevance = np.asarray(relevances, dtype=float)
+    bands = [relevance >= 0.75, relevance >= 0.5]
+    colors = np.select(bands, [RELEVANCE_COLORS["high"], RELEVANCE_COLORS["medium"]], RELEVANCE_COLORS["low"])
+    relevance_labels = np.select(bands, ["High", "Medium"], "Low")
+    
+    df = pd.DataFrame({
+        "published": pub_dates,
+        "title": titles,
+        "source": sources,
+        "summary": summaries,
+        "url": urls,
+        "relevance_score": relevances,
+        "color": colors,
+        "relevance_label": relevance_labels,
+    })
     df = df.sort_values("published", ascending=True).tail(15)  # Last 15 items
+    df["title_short"] = df["title"].str.slice(0, 40)
     
     # Create timeline using scatter plot
     fig = go.Figure()
@@ -196,7 +200,7 @@ def build_news_timeline(ingestion_result: Dict[str, Any]) -> Optional[go.Figure]
             color=df["color"],
             line=dict(width=2, color="white"),
         ),
-        text=df["title"].str[:40],
+        text=df["title_short"],
         textposition="top center",
         textfont=dict(size=9),
         hovertemplate=(
@@ -246,23 +250,28 @@ def build_scenario_comparison(simulation_result: Dict[str, Any]) -> Optional[go.
     if not scenarios:
         return None
     
-    # Prepare data
-    scenario_data = []
+    # Prepare data, one list per column
+    labels, delays, impacts, disruption_types, affected_nodes, severities = [], [], [], [], [], []
     for scenario in scenarios:
         # Truncate news title for x-axis readability
         title = scenario.get("news_title", "Unknown")[:35]
         node_id = scenario.get("node_id", "Unknown")
         
-        scenario_data.append({
-            "scenario_label": f"{node_id}\n{title}",
-            "delay_days": scenario.get("estimated_delay_days", 0),
-            "impact_pct": scenario.get("service_level_impact_pct", 0),
-            "disruption_type": scenario.get("disruption_type", "Unknown"),
-            "affected_nodes": scenario.get("affected_nodes_count", 0),
-            "severity": scenario.get("severity_used", 0),
-        })
-    
-    df = pd.DataFrame(scenario_data)
+        labels.append(f"{node_id}\n{title}")
+        delays.append(scenario.get("estimated_delay_days", 0))
+        impacts.append(scenario.get("service_level_impact_pct", 0))
+        disruption_types.append(scenario.get("disruption_type", "Unknown"))
+        affected_nodes.append(scenario.get("affected_nodes_count", 0))
+        severities.append(scenario.get("severity_used", 0))
+    
+    df = pd.DataFrame({
+        "scenario_label": labels,
+        "delay_days": delays,
+        "impact_pct": impacts,
+        "disruption_type": disruption_types,
+        "affected_nodes": affected_nodes,
+        "severity": severities,
+    })
     
     # Create grouped bar chart
     fig = go.Figure()
@@ -293,17 +302,6 @@ def build_scenario_comparison(simulation_result: Dict[str, Any]) -> Optional[go.
         ),
     ))
     
-    # Enhance hover with full details
-    for idx, row in df.iterrows():
-        full_hover = (
-            f"<b>{row['scenario_label']}</b><br>" +
-            f"Delay: {row['delay_days']:.1f} days<br>" +
-            f"Service Impact: {row['impact_pct']:.1f}%<br>" +
-            f"Disruption Type: {row['disruption_type']}<br>" +
-            f"Affected Nodes: {row['affected_nodes']}<br>" +
-            f"Severity: {row['severity']:.2f}"
-        )
-    
     fig.update_layout(
         title="<b>Simulation Scenario Comparison</b>",
         xaxis_title="Scenario (Node + News)",
@@ -4,10 +4,11 @@ Runs continuous monitoring cycles
 """
 
 import logging
-import time
 import signal
 import sys
+import threading
 from core.orchestrator import Orchestrator
+from core.persistence import persistence
 
 # ─── Logging Configuration ───────────────────────────────────────────────────────
 logging.basicConfig(
@@ -18,14 +19,13 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-# Global flag for graceful shutdown
-RUNNING = True
+# Set on shutdown; also wakes the main loop out of its wait between cycles
+_stop = threading.Event()
 
 
 def signal_handler(sig, frame):
-    global RUNNING
     logger.info("\nShutdown signal received. Finishing current cycle and stopping...")
-    RUNNING = False
+    _stop.set()
 
 
 signal.signal(signal.SIGINT, signal_handler)
@@ -46,7 +46,7 @@ def main():
         "max_news_articles": 10
     }
 
-    while RUNNING:
+    while not _stop.is_set():
         cycle_count += 1
         logger.info(f"\nCycle #{cycle_count} starting...")
 
@@ -65,11 +65,13 @@ def main():
         else:
             logger.error("Cycle failed – see logs above for details")
 
-        if RUNNING:
+        if not _stop.is_set():
             sleep_minutes = 5  # ← change this for testing (e.g. 0.5 for fast cycles)
             logger.info(f"Next cycle in {sleep_minutes} minutes... (Ctrl+C to stop)")
-            time.sleep(sleep_minutes * 60)
+            if _stop.wait(timeout=sleep_minutes * 60):
+                break
 
+    persistence.wait_saves()  # cycles are written in the background
     logger.info("Supply Chain Risk Sentinel stopped gracefully.")
 
 